@@ -0,0 +1,82 @@
+# benchmarks/bench_history.py
+# Bandingkan biaya per pemindahan/undo/lookup: list history lama vs HistoryStore.
+# Jalankan: python benchmarks/bench_history.py [jumlah_entri]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.history_store import HistoryStore
+
+FOLDER_NAMES = ["Folder A", "Folder B", "Folder C", "Folder D", "Folder E"]
+FOLDER_PATHS = ["/sorted/A", "/sorted/B", "/sorted/C", "/sorted/D", "/sorted/E"]
+
+def make_entries(count):
+    return [(f"/intake/IMG_{i:07d}.JPG", f"{FOLDER_PATHS[i % 5]}/IMG_{i:07d}.JPG") for i in range(count)]
+
+def old_move(history, history_cache, src_path, dest_path):
+    """Salinan logika lama move_to_custom_folder (tanpa I/O)."""
+    norm_src_path = os.path.normcase(os.path.normpath(src_path))
+    history = [(s, d) for s, d in history if os.path.normcase(os.path.normpath(s)) != norm_src_path]
+    history.append((src_path, dest_path))
+    history_cache[norm_src_path] = dest_path
+    return history
+
+def old_folder_name(history_cache, path):
+    """Salinan logika lama get_folder_name_from_history."""
+    dest_path = history_cache.get(os.path.normcase(os.path.normpath(path)))
+    dest_folder = os.path.dirname(dest_path)
+    norm_dest_folder = os.path.normcase(os.path.normpath(dest_folder))
+    for i, folder_path in enumerate(FOLDER_PATHS):
+        if norm_dest_folder.startswith(os.path.normcase(os.path.normpath(folder_path))):
+            return FOLDER_NAMES[i]
+    return os.path.basename(os.path.normpath(dest_folder))
+
+def per_op(fn, ops):
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    return (time.perf_counter() - start) / ops
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    entries = make_entries(count)
+
+    history = list(entries)
+    history_cache = {os.path.normcase(os.path.normpath(s)): d for s, d in entries}
+
+    def old_move_op(i):
+        global history
+        src = entries[i * 7919 % count][0]
+        history = old_move(history, history_cache, src, f"/sorted/B/{os.path.basename(src)}")
+
+    def old_undo_op(i):
+        history.pop()
+
+    old_move_time = per_op(old_move_op, 3)
+    old_undo_time = per_op(old_undo_op, 3)
+    old_name_time = per_op(lambda i: old_folder_name(history_cache, entries[i % count][0]), 10000)
+
+    store = HistoryStore()
+    store.set_folders(FOLDER_NAMES, FOLDER_PATHS)
+    for src, dest in entries:
+        store.set(src, dest)
+
+    def new_move_op(i):
+        src = entries[i * 7919 % count][0]
+        store.set(src, f"/sorted/B/{os.path.basename(src)}")
+
+    def new_undo_op(i):
+        src, _ = store.last()
+        store.remove(src)
+
+    new_move_time = per_op(new_move_op, 100000)
+    new_undo_time = per_op(new_undo_op, 100000)
+    new_name_time = per_op(lambda i: store.folder_name(store.get(entries[i % count][0]) or "/sorted/A/x"), 10000)
+
+    print(f"history entries: {count}")
+    print(f"move    list: {old_move_time * 1e3:10.2f} ms/op   store: {new_move_time * 1e6:8.2f} us/op")
+    print(f"undo    list: {old_undo_time * 1e6:10.2f} us/op   store: {new_undo_time * 1e6:8.2f} us/op")
+    print(f"folder  list: {old_name_time * 1e6:10.2f} us/op   store: {new_name_time * 1e6:8.2f} us/op")
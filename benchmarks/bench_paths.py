@@ -0,0 +1,78 @@
+# benchmarks/bench_paths.py
+# Bandingkan memori daftar sesi: list of str (image_files, filtered_files, filter_cache,
+# image_cache) vs PathTable + PathList berbasis indeks.
+# Jalankan: python benchmarks/bench_paths.py [jumlah_file]
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.path_table import PathList, PathTable
+
+FOLDER = "/mnt/photos/2024/camera-roll-export"
+
+def make_paths(count):
+    exts = [".jpg", ".JPG", ".png", ".webp"]
+    return [f"{FOLDER}/IMG_{i:07d}{exts[i % 4]}" for i in range(count)]
+
+def measure(build):
+    """Waktu build diukur tanpa tracemalloc (overhead-nya besar), memori diukur terpisah."""
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+def build_lists(count):
+    """Representasi lama: setiap daftar menyimpan string path sendiri-sendiri."""
+    image_files = make_paths(count)  # String dibuat ulang per file, seperti hasil scan
+    filtered_files = [p for p in image_files if p.lower().endswith(".jpg")]
+    filter_cache = {"All Files": image_files[:], ".jpg": filtered_files[:]}
+    image_cache = {FOLDER: image_files.copy()}
+    return image_files, filtered_files, filter_cache, image_cache
+
+def build_table(count):
+    image_files = PathList(PathTable())
+    for start in range(0, count, 256):
+        # Path sementara dari thread validasi langsung dibuang setelah masuk tabel
+        image_files.extend(make_paths_range(start, min(start + 256, count)))
+    table = image_files.table
+    filtered_files = image_files.select(lambda row: table.name_endswith(row, b".jpg"))
+    filter_cache = {"All Files": image_files.copy(), ".jpg": filtered_files.copy()}
+    image_cache = {FOLDER: image_files.copy()}
+    return image_files, filtered_files, filter_cache, image_cache
+
+def make_paths_range(start, stop):
+    exts = [".jpg", ".JPG", ".png", ".webp"]
+    return [f"{FOLDER}/IMG_{i:07d}{exts[i % 4]}" for i in range(start, stop)]
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    lists, list_bytes, list_time = measure(lambda: build_lists(count))
+    del lists
+    (image_files, filtered_files, _, _), table_bytes, table_time = measure(lambda: build_table(count))
+
+    table_nbytes = image_files.table.nbytes()
+    start = time.perf_counter()
+    for i in range(0, count, 7):
+        image_files[i]
+    index_time = (time.perf_counter() - start) / len(range(0, count, 7))
+    sample = [image_files[i] for i in range(0, count, 997)]
+    filtered_files.position(sample[0])  # Peta posisi dibangun sekali
+    start = time.perf_counter()
+    for path in sample:
+        filtered_files.position(path)
+    position_time = (time.perf_counter() - start) / len(sample)
+
+    print(f"files: {count} ({len(filtered_files)} after .jpg filter)")
+    print(f"list of str : {list_bytes / 1e6:8.1f} MB   build {list_time:6.2f} s")
+    print(f"path table  : {table_bytes / 1e6:8.1f} MB   build {table_time:6.2f} s")
+    print(f"index lookup: {index_time * 1e6:.2f} us   position lookup: {position_time * 1e6:.2f} us")
+    print(f"lookup index: +{(image_files.table.nbytes() - table_nbytes) / 1e6:.1f} MB (dibangun saat find() pertama)")
@@ -21,8 +21,11 @@ except ImportError as e:
     print(f"[ERROR] Failed to import resources: {e}")
 
 from pathlib import Path
-import shutil
 import json
+import time
+import weakref
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QLabel, QPushButton,
@@ -31,12 +34,32 @@ from PySide6.QtWidgets import (
     QMenu, QColorDialog, QFrame, QStyleOption, QStyle, QComboBox, QGraphicsDropShadowEffect,
     QProgressBar, QStackedLayout, QScrollArea, QTextEdit  # Added QTextEdit for release notes
 )
-from PySide6.QtGui import QPixmap, QAction, QImageReader, QIcon, QFont, QShortcut, QKeySequence, QDesktopServices
+from PySide6.QtGui import QPixmap, QAction, QActionGroup, QIcon, QFont, QShortcut, QKeySequence, QDesktopServices
 from PySide6.QtCore import Qt, QSettings, QMimeData, QPropertyAnimation, QEasingCurve, QTimer, QThread, QSize, Property, Signal, QUrl
-from glob import glob
 
 # Import resize function from utils/image_utils.py
-from utils.image_utils import resize_image, resize_next_preview
+from utils.image_utils import MAIN_PREVIEW, NEXT_PREVIEW, NEXT_PREVIEW_SIZE
+from utils.image_cache import PreviewCache
+from utils.prefetch import PreviewPrefetcher
+from utils.move_queue import MoveQueue
+from utils.history_journal import HistoryJournal
+from utils.history_store import HistoryStore
+from utils.availability import AvailabilityMap, AVAILABLE, MOVED, MISSING
+from utils.file_scanner import (is_supported_image, list_image_files, merge_import_sources, scan_image_entries,
+                                walk_image_folders)
+from utils.image_validator import ImageValidator
+from utils.folder_index import FolderIndex
+from utils.folder_watcher import FolderWatcher
+from utils.folder_listing_cache import FolderListingCache
+from utils.cancellation import CancellationToken
+from utils.progress import ProgressThrottle
+from utils.path_table import PathList
+from utils.metadata_table import MetadataTable, format_file_size, read_metadata
+from utils.query_filter import ALL_FILES, parse_query
+from utils.session_order import DEFAULT_ORDER, METADATA_ORDERS, ORDERS, has_natural_ranks, natural_ranks, order_rows
+from utils.thumbnail_cache import ThumbnailCache
+from utils.thumbnail_pack import ThumbnailPackStore
+from utils.stat_cache import StatCache
 
 def get_config_path():
     """Get the path to settings.json, always relative to the application directory."""
@@ -51,35 +74,36 @@ def get_config_path():
     print(f"[DEBUG] Using config path: {config_path}")
     return config_path
 
-def save_history(history):
-    config_path = get_config_path()
-    history_path = os.path.join(os.path.dirname(config_path), "history.json")
-    try:
-        with open(history_path, "w", encoding="utf-8") as f:
-            json.dump(history, f, indent=4)
-        print(f"[DEBUG] History saved to {history_path}")
-    except IOError as e:
-        print(f"[DEBUG] Error saving history: {e}")
+def get_folder_index_path():
+    """Path database indeks folder, disimpan di samping settings.json."""
+    return os.path.join(os.path.dirname(get_config_path()), "folder_index.db")
+
+def get_thumbnail_pack_dir():
+    """Direktori pack thumbnail per folder sumber, di samping settings.json."""
+    return os.path.join(os.path.dirname(get_config_path()), "thumbnail_packs")
+
+def get_thumbnail_index_path():
+    """Indeks thumbnail freedesktop yang ditulis aplikasi ini, di samping settings.json."""
+    return os.path.join(os.path.dirname(get_config_path()), "thumbnail_cache.db")
+
+def default_thumbnail_cache_mb():
+    """Cache thumbnail freedesktop hanya aktif default di Linux; platform lain tidak memakainya."""
+    return 512 if sys.platform.startswith("linux") else 0
+
+def get_history_journal():
+    """Journal history (JSON Lines) di samping settings.json; history.json lama dimigrasi otomatis."""
+    config_dir = os.path.dirname(get_config_path())
+    return HistoryJournal(os.path.join(config_dir, "history.jsonl"),
+                          legacy_path=os.path.join(config_dir, "history.json"))
 
 def load_history():
-    config_path = get_config_path()
-    history_path = os.path.join(os.path.dirname(config_path), "history.json")
+    history = HistoryStore(get_history_journal())
     try:
-        if os.path.exists(history_path):
-            with open(history_path, "r", encoding="utf-8") as f:
-                history = json.load(f)
-                print(f"[DEBUG] Loaded history from {history_path}")
-                # Populate history_cache
-                history_cache = {}
-                for src, dest in history:
-                    norm_src = os.path.normcase(os.path.normpath(src))
-                    history_cache[norm_src] = dest
-                return history, history_cache
-        else:
-            print(f"[DEBUG] No history file found at {history_path}, returning empty list")
-    except (json.JSONDecodeError, IOError) as e:
+        history.load()
+        print(f"[DEBUG] Loaded history from {history.journal.path}")
+    except (KeyError, TypeError, IOError) as e:
         print(f"[DEBUG] Error loading history: {e}")
-    return [], {}
+    return history
 
 def resource_path(relative_path):
     """Find the file path relative to the application directory."""
@@ -100,6 +124,17 @@ def load_settings():
         "folder_paths": ["output/A", "output/B", "output/C", "output/D", "output/E"],
         "recent_folders": [],
         "theme_mode": "system",
+        "validation_workers": 0,  # 0 = sesuai jumlah CPU
+        "preview_cache_mb": 256,
+        "thumbnail_cache_mb": default_thumbnail_cache_mb(),  # Cache thumbnail freedesktop di ~/.cache/thumbnails, 0 = nonaktif
+        "thumbnail_pack_mb": 0,  # Batas pack thumbnail per folder sumber (satu file + indeks), 0 = nonaktif
+        "prefetch_count": 3,
+        "stat_cache_ttl": 2.0,  # Detik hasil cek file (ada, ukuran, mtime) dianggap masih berlaku
+        "prefetch_workers": 2,
+        "folder_watch_mode": "auto",  # auto / watcher / poll / off
+        "recursive_import": False,  # Ikut import gambar di semua subfolder
+        "folder_cache_mb": 128,  # Batas memori daftar folder yang sudah di-import (dibuka ulang tanpa scan)
+        "session_order": "natural",  # natural / mtime / taken / size, lihat utils.session_order
         "custom_theme": {
             "bg_color": "#121212",
             "text_color": "#FFFFFF",
@@ -485,26 +520,266 @@ class AboutDialog(QDialog):
                 """)
 
 class ImageValidationThread(QThread):
-    progress_updated = Signal(int)
+    progress_updated = Signal(int, str)  # persen, format teks progress bar (kecepatan dan ETA)
+    images_found = Signal(list)  # Potongan path valid, dikirim bertahap ke UI
+
+    FIRST_CHUNK_SIZE = 8  # Potongan pertama kecil agar gambar pertama cepat tampil
+    CHUNK_SIZE = 256
+    PROGRESS_UPDATES_PER_SECOND = 10
 
-    def __init__(self, files, parent=None):
+    WALK_WORKERS = 4  # Folder yang di-scandir paralel saat import rekursif
+
+    def __init__(self, files=None, parent=None, folder_path=None, max_workers=0, index_path=None, token=None,
+                 recursive=False, folders=None):
         super().__init__(parent)
         self.files = files
-        self.valid_images = []
+        self.token = token or CancellationToken()
+        self.folder_path = folder_path
+        self.folders = folders  # Beberapa folder sekaligus (drop), ditambah `files`, dalam satu sesi
+        self.max_workers = max_workers
+        self.recursive = recursive
+        self.validator = None  # Satu worker pool untuk semua folder dan file dalam satu import
+        self.dir_mtimes = {}  # Folder yang dipindai -> mtime_ns sebelum scan, untuk watcher dan cache daftar folder
+        self.index = (FolderIndex(index_path)
+                      if index_path and (folders or (folder_path and files is None)) else None)
+
+    def run(self):
+        try:
+            if self.folders is not None:
+                self.run_sources()
+            elif self.files is None and self.recursive:
+                self.run_recursive()
+            elif self.files is None and self.index is not None:
+                self.run_indexed()
+            else:
+                if self.files is None:
+                    try:
+                        self.dir_mtimes[self.folder_path] = os.stat(self.folder_path).st_mtime_ns
+                    except OSError:
+                        pass
+                    self.files = list_image_files(self.folder_path, self.token)
+                candidates = [file for file in self.files if is_supported_image(file)]
+                self.validate_candidates(candidates)
+        finally:
+            if self.validator is not None:
+                self.validator.close()
+
+    def run_sources(self):
+        """
+        Import beberapa folder dan file hasil drop sebagai satu sesi. Sumber sudah dibuat
+        tidak tumpang tindih oleh merge_import_sources; semua validasi memakai satu worker pool.
+        """
+        sources = len(self.folders) + (1 if self.files else 0)
+        for done, folder in enumerate(self.folders):
+            if self.token.cancelled:
+                return
+            self.progress_updated.emit(done * 100 // sources,
+                                       f"%p%  ·  {done + 1}/{sources} sources  ·  {os.path.basename(folder)}")
+            if self.recursive:
+                self.run_recursive(folder, report_progress=False)
+            elif self.index is not None:
+                self.run_indexed(folder, report_progress=False)
+            else:
+                self.validate_candidates(list_image_files(folder, self.token), report_progress=False)
+        if self.files and not self.token.cancelled:
+            self.progress_updated.emit(len(self.folders) * 100 // sources,
+                                       f"%p%  ·  {sources}/{sources} sources  ·  {len(self.files)} files")
+            self.validate_candidates([file for file in self.files if is_supported_image(file)],
+                                     report_progress=False)
+        if not self.token.cancelled:
+            self.progress_updated.emit(100, "%p%")
+
+    def run_recursive(self, root=None, report_progress=True):
+        """
+        Import folder beserta seluruh subfoldernya. Folder ditelusuri paralel dan setiap
+        folder langsung divalidasi (memakai indeks jika ada), sehingga gambar dari folder
+        pertama sudah tampil sebelum penelusuran selesai.
+        """
+        root = root or self.folder_path
+        folders = 0
+        last_update = 0.0
+        for folder, entries, pending in walk_image_folders(root, self.token, self.WALK_WORKERS, self.dir_mtimes):
+            if self.index is not None:
+                self.run_indexed(folder, entries, report_progress=False)
+            else:
+                self.validate_candidates([entry.path for entry in entries], report_progress=False)
+            if self.token.cancelled:
+                return
+            folders += 1
+            now = time.monotonic()
+            if report_progress and (now - last_update >= 1 / self.PROGRESS_UPDATES_PER_SECOND or not pending):
+                # Total folder belum diketahui selama penelusuran: persen dari folder yang sudah ditemukan
+                subpath = os.path.relpath(folder, root)
+                self.progress_updated.emit(folders * 100 // (folders + pending),
+                                           f"%p%  ·  {folders} folder(s)  ·  {subpath}")
+                last_update = now
+
+    def run_indexed(self, folder=None, entries=None, report_progress=True):
+        """
+        Import folder memakai indeks SQLite; hanya file yang berubah yang divalidasi ulang.
+        `entries` berisi DirEntry hasil scan sebelumnya (import rekursif) agar folder tidak di-scan dua kali.
+        """
+        folder = folder or self.folder_path
+        try:
+            dir_mtime = os.stat(folder).st_mtime_ns
+        except OSError as e:
+            print(f"[DEBUG] Cannot stat folder {folder}: {e}")
+            return
+        # Import rekursif: folder sudah di-scandir oleh walker, jadi pakai mtime yang dicatat sebelum scandir
+        # agar file yang muncul setelah scan tidak tersembunyi oleh indeks yang tampak masih berlaku
+        dir_mtime = self.dir_mtimes.setdefault(folder, dir_mtime)
+
+        if self.index.is_fresh(folder, dir_mtime):
+            # Folder tidak berubah sejak diindeks: tidak perlu scan maupun validasi
+            prefix = os.path.join(folder, "")
+            valid = [prefix + name for name in self.index.load_valid_names(folder)]
+            self.emit_chunks(valid)
+            if report_progress:
+                self.progress_updated.emit(100, "%p%")
+            print(f"[DEBUG] Folder index hit: {len(valid)} images from {folder}")
+            return
+
+        _, rows = self.index.load(folder)
+        scanned = []
+        known_valid = []
+        candidates = []
+        for entry in (entries if entries is not None else scan_image_entries(folder, self.token)):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            scanned.append((entry.name, st.st_size, st.st_mtime_ns))
+            cached = rows.get(entry.name)
+            if cached is not None and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                if cached[2]:
+                    known_valid.append(entry.path)
+            else:
+                candidates.append(entry.path)
+        if self.token.cancelled:
+            return
+        print(f"[DEBUG] Folder index: {len(scanned) - len(candidates)} unchanged, {len(candidates)} to validate")
+
+        self.emit_chunks(known_valid)
+        formats = self.validate_candidates(candidates, report_progress)
+        if self.token.cancelled:
+            return  # Hasil parsial tidak disimpan ke indeks
+        self.index.save(folder, dir_mtime, [
+            (name, size, mtime_ns, formats.get(name, rows.get(name, (0, 0, ''))[2]) or '')
+            for name, size, mtime_ns in scanned
+        ])
+
+    def emit_chunks(self, paths):
+        size = self.FIRST_CHUNK_SIZE
+        start = 0
+        while start < len(paths) and not self.token.cancelled:
+            chunk = paths[start:start + size]
+            self.images_found.emit(chunk)
+            start += len(chunk)
+            size = self.CHUNK_SIZE
+
+    def validate_candidates(self, candidates, report_progress=True):
+        """Validasi file di worker pool, kirim hasil bertahap, kembalikan dict nama -> format."""
+        formats = {}
+        if self.validator is None:
+            self.validator = ImageValidator(self.max_workers)
+        validator = self.validator
+        throttle = ProgressThrottle(len(candidates), self.PROGRESS_UPDATES_PER_SECOND)
+        processed = 0
+        for count, results in validator.validate_batches(candidates, self.FIRST_CHUNK_SIZE, self.CHUNK_SIZE,
+                                                            self.token):
+            processed += count
+            valid = []
+            for path, fmt in results:
+                formats[os.path.basename(path)] = fmt
+                if fmt:
+                    valid.append(path)
+            if valid:
+                self.images_found.emit(valid)
+            update = throttle.update(processed, force=processed == len(candidates))
+            if report_progress and update is not None:
+                self.progress_updated.emit(*update)
+        for line in validator.stats.summary():
+            print(f"[DEBUG] Validation {line}")
+        return formats
+
+class MetadataThread(QThread):
+    """
+    Isi tabel metadata (ukuran, dimensi, tanggal, orientasi, mtime) di latar belakang.
+    Metadata yang tersimpan di indeks folder dipakai selama ukuran dan mtime file sama;
+    sisanya dibaca dari header secara paralel oleh worker pool (I/O kecil per file,
+    GIL dilepas saat membaca disk) lalu disimpan ke indeks untuk import berikutnya.
+    """
+    metadata_ready = Signal(list)  # list of (row, size, width, height, taken, orientation, mtime_ns)
+
+    BATCH_INTERVAL = 0.25  # detik; hasil dikirim per batch agar event loop tidak dibanjiri
+    CHUNK_SIZE = 256  # row per putaran; batas tugas yang antre di pool sekaligus titik cek pembatalan
+
+    def __init__(self, table, rows, parent=None, token=None, max_workers=None, index_path=None, rank_names=False):
+        super().__init__(parent)
+        self.table = table
+        self.rows = rows
+        self.token = token or CancellationToken()
+        self.max_workers = max_workers or min(8, os.cpu_count() or 4)
+        self.index = FolderIndex(index_path) if index_path else None
+        self.rank_names = rank_names  # Hitung juga peringkat nama natural (setelah import selesai)
+
+    @staticmethod
+    def load(stored, path):
+        """(metadata, dibaca dari header?) untuk `path`; `stored` dari FolderIndex.load_metadata."""
+        entry = stored.get(os.path.basename(path))
+        if entry is not None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None, False
+            size, mtime_ns, width, height, taken, orientation = entry
+            if st.st_size == size and st.st_mtime_ns == mtime_ns:
+                return (size, width, height, taken, orientation, mtime_ns), False
+        return read_metadata(path), True
 
     def run(self):
-        supported_formats = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.tiff', '.heic', '.heif', '.raw', '.psd')
-        total_files = len(self.files)
-        for i, file in enumerate(self.files):
-            if file.lower().endswith(supported_formats):
+        # Kelompokkan per folder agar metadata tersimpan dibaca sekali per folder
+        by_folder = {}
+        for row in self.rows:
+            by_folder.setdefault(self.table.folder(row), []).append(row)
+        batch = []
+        last_emit = time.monotonic()
+        stored_hits = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="metadata") as pool:
+            for folder, folder_rows in by_folder.items():
+                stored = self.index.load_metadata(folder) if self.index is not None else {}
+                fresh = []
                 try:
-                    img = QImageReader(file)
-                    if img.canRead():
-                        self.valid_images.append(file)
-                except Exception:
-                    pass
-            progress = int((i + 1) / total_files * 100)
-            self.progress_updated.emit(progress)
+                    for start in range(0, len(folder_rows), self.CHUNK_SIZE):
+                        if self.token.cancelled:
+                            return
+                        rows = folder_rows[start:start + self.CHUNK_SIZE]
+                        paths = [self.table.path(row) for row in rows]
+                        for row, path, (metadata, is_fresh) in zip(
+                                rows, paths, pool.map(lambda path: self.load(stored, path), paths)):
+                            if metadata is None:
+                                continue
+                            batch.append((row,) + metadata)
+                            if is_fresh:
+                                size, width, height, taken, orientation, mtime_ns = metadata
+                                fresh.append((os.path.basename(path), size, mtime_ns,
+                                              width, height, taken, orientation))
+                            else:
+                                stored_hits += 1
+                        if batch and time.monotonic() - last_emit >= self.BATCH_INTERVAL:
+                            self.metadata_ready.emit(batch)
+                            batch = []
+                            last_emit = time.monotonic()
+                finally:
+                    # Hasil yang sudah dibaca tetap disimpan meskipun pengisian dibatalkan
+                    if fresh and self.index is not None:
+                        self.index.save_metadata(folder, fresh)
+        if batch:
+            self.metadata_ready.emit(batch)
+        if self.rows:
+            print(f"[DEBUG] Metadata: {stored_hits} from folder index, {len(self.rows) - stored_hits} read")
+        if self.rank_names and not self.token.cancelled:
+            natural_ranks(self.table)  # Kunci urut nama disiapkan di sini, bukan di thread UI
 
 class CustomThemeDialog(QDialog):
     def __init__(self, parent=None):
@@ -793,27 +1068,72 @@ class FolderSettingsDialog(QDialog):
         return self.folder_names, self.folder_paths
 
 class ImageSorterApp(QMainWindow):
+    STAT_REFRESH_WINDOW = 16  # Gambar berikutnya yang keberadaannya di-stat di latar belakang
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("ImageSorter")
         self.resize(900, 700)
         self.setAcceptDrops(True)
-        self.image_cache = {}
-        self.image_files = []
+        self.folder_listings = FolderListingCache(load_settings().get("folder_cache_mb", 128) * 1024 * 1024)
+        self.image_files = PathList()  # Indeks ke PathTable sesi, bukan list of str
         self.current_index = 0
         self.nav_history = []
+        self.user_navigated = False  # Pengguna sudah berpindah/memindahkan gambar di sesi ini
         self.folder_names = []
         self.folder_paths = []
         self.log_buffer = []
         self.source_info = ""
         self.recent_folders = []
         self.theme_mode = "system"
-        self.filtered_files = []
-        self.history, self.history_cache = load_history()  # Updated to load history_cache
-        self.file_exists_cache = {}
+        self.filtered_files = PathList(self.image_files.table)
+        self.history = load_history()
+        self.history_flush_timer = QTimer(self)
+        self.history_flush_timer.timeout.connect(self.history.journal.flush)
+        self.history_flush_timer.start(2000)
         self.filter_cache = {}
         self.defer_ui_updates = False
-        self.last_filter = "All Files"
+        self.last_filter = ALL_FILES
+        self.current_query = parse_query(ALL_FILES)
+        self.metadata_tables = weakref.WeakKeyDictionary()  # PathTable -> MetadataTable
+        self.metadata = self.metadata_for(self.image_files.table)
+        self.metadata_thread = None
+        self.metadata_refill = False
+        self.is_importing = False
+        self.session_order = load_settings().get("session_order", DEFAULT_ORDER)
+        if self.session_order not in ORDERS:
+            self.session_order = DEFAULT_ORDER
+        self.availability = AvailabilityMap()
+        self.missing_paths = set()
+        settings = load_settings()
+        thumbnail_cache_mb = settings.get("thumbnail_cache_mb", default_thumbnail_cache_mb())
+        self.thumbnail_cache = ThumbnailCache(thumbnail_cache_mb * 1024 * 1024,
+                                              index_path=get_thumbnail_index_path()) if thumbnail_cache_mb > 0 else None
+        thumbnail_pack_mb = settings.get("thumbnail_pack_mb", 0)
+        self.thumbnail_packs = ThumbnailPackStore(get_thumbnail_pack_dir(), NEXT_PREVIEW_SIZE,
+                                                  thumbnail_pack_mb * 1024 * 1024) if thumbnail_pack_mb > 0 else None
+        self.stat_cache = StatCache(ttl=settings.get("stat_cache_ttl", 2.0))
+        self.preview_cache = PreviewCache(settings.get("preview_cache_mb", 256) * 1024 * 1024,
+                                          self.thumbnail_cache, self.thumbnail_packs, self.stat_cache)
+        self.prefetcher = PreviewPrefetcher(self.preview_cache,
+                                            count=settings.get("prefetch_count", 3),
+                                            workers=settings.get("prefetch_workers", 2))
+        self.nav_direction = 1  # 1 = maju, -1 = mundur; menentukan arah prefetch
+        self.pending_moves = {}  # job_id -> path asli gambar
+        self.latest_moves = {}  # path asli (normcase) -> job_id terakhir untuk file tersebut
+        self.move_queue = MoveQueue(self)
+        self.move_queue.job_finished.connect(self.on_move_finished)
+        self.move_queue.job_failed.connect(self.on_move_failed)
+        self.move_queue.start()
+        self.rejected_paths = set()  # File baru dari watcher yang gagal validasi
+        self.watched_folder = None
+        self.session_root = None  # Folder yang di-import; nama file di subfolder ditampilkan relatif terhadapnya
+        self.watch_threads = []
+        self.folder_watcher = FolderWatcher(self, mode=settings.get("folder_watch_mode", "auto"))
+        self.folder_watcher.contents_changed.connect(self.on_folder_contents_changed)
+        self.thread = None  # Thread import yang sedang aktif
+        self.retired_threads = []  # Import lama yang dibatalkan, dirujuk sampai benar-benar berhenti
+        self.session_token = CancellationToken()  # Dibatalkan setiap kali sesi diganti
 
         # Rest of __init__ remains unchanged
         self.loading_widget = QDialog(self, Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint)
@@ -913,11 +1233,12 @@ class ImageSorterApp(QMainWindow):
         self.load_recent_folders()
         self.theme_mode = "system"
         self.current_index = 0
-        self.filtered_files = []
-        self.image_files = []
+        self.image_files = PathList()
+        self.filtered_files = PathList(self.image_files.table)
+        self.metadata = self.metadata_for(self.image_files.table)
         self.nav_history = []
-        self.history = []
-        save_history(self.history)
+        self.history.clear()
+        self.rebuild_availability()
         self.show_current_image(self.filtered_files)
 
     def open_custom_theme_editor(self):
@@ -968,17 +1289,11 @@ class ImageSorterApp(QMainWindow):
         urls = event.mimeData().urls()
         if not urls:
             return
-        path = urls[0].toLocalFile()
-        if os.path.isdir(path):
-            self.import_folder_common(path)
-        elif os.path.isfile(path) and self.is_image_file(path):
-            self.show_loading(True)
-            source_folder = os.path.dirname(path)
-            self.update_recent_folders(source_folder)
-            self.image_files = [path]
-            self.thread = ImageValidationThread(self.image_files)
-            self.thread.finished.connect(lambda: self.process_valid_images_and_update_ui(source_folder))
-            self.thread.start()
+        paths = [url.toLocalFile() for url in urls if url.isLocalFile()]
+        folders = [path for path in paths if os.path.isdir(path)]
+        files = [path for path in paths if os.path.isfile(path) and self.is_image_file(path)]
+        if folders or files:
+            self.import_sources(folders, files)
         else:
             self.show_loading(False)
             msg = QMessageBox()
@@ -988,68 +1303,184 @@ class ImageSorterApp(QMainWindow):
             self.apply_message_box_style(msg)
             msg.exec()
 
+    def import_sources(self, folders, files):
+        """
+        Import semua folder dan file hasil drop sebagai satu sesi tanpa duplikat.
+        Satu folder saja tetap memakai jalur import folder biasa (cache dan indeks).
+        """
+        recursive = load_settings().get("recursive_import", False)
+        folders, files = merge_import_sources(folders, files, recursive)
+        if len(folders) == 1 and not files:
+            self.import_folder_common(folders[0])
+            return
+        self.show_loading(True)
+        for folder in reversed(folders):
+            self.update_recent_folders(folder)
+        if not folders:
+            self.update_recent_folders(os.path.dirname(files[0]))
+        try:
+            # Nama file ditampilkan relatif terhadap folder induk bersama semua sumber
+            root = os.path.commonpath(folders + [os.path.dirname(file) for file in files])
+        except ValueError:
+            root = None  # Drive berbeda (Windows)
+        self.start_validation(root, files=files, folders=folders)
+
     def import_folder_common(self, folder_path):
         self.show_loading(True)
         self.position_stack.setCurrentIndex(1)
         self.progress_bar.setValue(0)
         self.update_recent_folders(folder_path)
-        if folder_path in self.image_cache:
-            self.image_files = self.image_cache[folder_path]
-            self.current_index = 0
-            self.nav_history = []
+        cached_files = self.folder_listings.get(folder_path)
+        if cached_files is not None:
+            self.reset_session()
+            self.image_files = cached_files
+            self.filtered_files = PathList(self.image_files.table)
+            self.metadata = self.metadata_for(self.image_files.table)
+            self.session_root = folder_path
             self.source_info = f"Files successfully imported from: {folder_path}"
             self.apply_filter()
             self.show_notification(self.source_info)
             self.show_current_image(self.filtered_files)
             self.show_loading(False)
             self.position_stack.setCurrentIndex(0)
+            self.start_watching([folder_path])
+            self.start_metadata_fill()
+            if self.metadata_thread is None:
+                self.apply_session_order()  # Kunci urut sudah ada dari import sebelumnya
+            if self.thumbnail_packs is not None:
+                self.thumbnail_packs.schedule(list(self.image_files), self.session_token)
             return
-        supported_formats = ('*.png', '*.jpg', '*.jpeg', '*.gif', '*.bmp', '*.webp',
-                            '*.tiff', '*.heic', '*.heif', '*.raw', '*.psd')
-        all_files = []
-        for ext in supported_formats:
-            all_files.extend(glob(os.path.join(folder_path, ext)))
-        if not all_files:
-            self.show_loading(False)
-            self.position_stack.setCurrentIndex(0)
-            msg = QMessageBox()
-            msg.setWindowTitle("No Images")
-            msg.setText("No valid images found in this folder.")
-            msg.setIcon(QMessageBox.Warning)
-            self.apply_message_box_style(msg)
-            msg.exec()
+        self.start_validation(folder_path)
+
+    def reset_session(self):
+        """Kosongkan daftar gambar sesi aktif sebelum import baru."""
+        print(f"[DEBUG] Preview cache: {self.preview_cache.summary()}")
+        print(f"[DEBUG] Stat cache: {self.stat_cache.summary()}")
+        self.retire_import_thread()
+        if self.metadata_thread is not None:
+            self.retired_threads.append(self.metadata_thread)  # Berhenti lewat session_token
+            self.metadata_thread = None
+        self.metadata_refill = False
+        self.session_token.cancel()
+        self.session_token = CancellationToken()
+        self.prefetcher.cancel_all()
+        self.image_files = PathList()
+        self.filtered_files = PathList(self.image_files.table)
+        self.metadata = self.metadata_for(self.image_files.table)
+        self.filter_cache = {}
+        self.stat_cache.clear()
+        self.current_index = 0
+        self.nav_history = []
+        self.user_navigated = False
+        self.missing_paths = set()
+        self.rejected_paths = set()
+        self.stop_watching()
+        self.rebuild_availability()
+        self.last_filter = self.filter_combo.currentText()
+        self.current_query = self.current_filter_query()
+
+    def start_validation(self, folder_path, files=None, folders=None):
+        """
+        Mulai validasi di thread terpisah. Jika `files` kosong, folder dipindai di thread.
+        Dengan `folders`, semua folder tersebut ditambah `files` di-import sebagai satu sesi.
+        Gambar valid dikirim bertahap sehingga gambar pertama tampil sebelum validasi selesai.
+        """
+        self.reset_session()
+        self.show_current_image(self.filtered_files)
+        self.is_importing = True
+        self.position_stack.setCurrentIndex(1)
+        self.update_progress(0, "%p%")
+        settings = load_settings()
+        self.session_root = folder_path
+        thread = ImageValidationThread(files, folder_path=folder_path,
+                                       max_workers=settings.get("validation_workers", 0),
+                                       index_path=get_folder_index_path(),
+                                       token=CancellationToken(),
+                                       recursive=settings.get("recursive_import", False),
+                                       folders=folders)
+        watch_folders = [folder_path] if files is None and folders is None else list(folders or [])
+        thread.progress_updated.connect(self.update_progress)
+        thread.images_found.connect(lambda paths, t=thread: self.append_valid_images(paths, t))
+        thread.finished.connect(lambda t=thread, watch=watch_folders:
+                                self.process_valid_images_and_update_ui(folder_path, t, watch))
+        self.thread = thread
+        thread.start()
+
+    def update_progress(self, value, text):
+        """Update progress bar import (sudah dibatasi frekuensinya oleh thread validasi)."""
+        self.progress_bar.setValue(value)
+        self.progress_bar.setFormat(text)
+
+    def retire_import_thread(self):
+        """Batalkan import yang masih berjalan; rujukannya disimpan sampai thread berhenti."""
+        thread = self.thread
+        self.thread = None
+        self.is_importing = False
+        if thread is None:
             return
-        self.image_files = all_files
-        self.thread = ImageValidationThread(all_files)
-        self.thread.progress_updated.connect(self.progress_bar.setValue)
-        self.thread.finished.connect(lambda: self.process_valid_images_and_update_ui(folder_path))
-        self.thread.start()
-
-    def process_valid_images(self):
-        self.image_files = self.thread.valid_images
-        if len(self.image_files) == 0:
-            msg = QMessageBox()
-            msg.setWindowTitle("No Images")
-            msg.setText("No valid images found in this folder.")
-            msg.setIcon(QMessageBox.Warning)
-            self.apply_message_box_style(msg)
-            msg.exec()
+        thread.token.cancel()
+        if thread.isRunning():
+            self.retired_threads.append(thread)
+
+    def release_import_thread(self, thread):
+        """Lepaskan thread import lama (dan daftar hasilnya) setelah selesai."""
+        if thread in self.retired_threads:
+            self.retired_threads.remove(thread)
+        thread.files = None
+
+    def cancel_import(self):
+        """Dipanggil tombol Cancel di samping progress bar; gambar yang sudah dimuat tetap dipakai."""
+        if self.thread is None or not self.is_importing:
+            self.show_loading(False)
             return
+        self.thread.token.cancel()
+        self.log_message("Import cancelled by user")
+
+    def append_valid_images(self, paths, thread=None, reuse_rows=False):
+        """
+        Tambahkan potongan gambar valid ke sesi yang sedang dimuat.
+        `reuse_rows=True` untuk file dari watcher yang bisa saja pernah ada di PathTable
+        (dipulihkan atau di-rename kembali): row lama dipakai lagi agar find() tetap cocok.
+        """
+        if thread is not None and thread is not self.thread:
+            return  # Hasil dari import lama, abaikan
+
+        was_empty = not self.filtered_files
+        last_index = len(self.filtered_files) - 1
+        if reuse_rows:
+            table = self.image_files.table
+            # Isi file bisa sudah berbeda: metadata row lama dibaca ulang
+            self.metadata.unload_rows([row for row in map(table.find, paths) if row is not None])
+            rows = [self.image_files.append(path) for path in paths]
+        else:
+            rows = self.image_files.extend(paths)
+        self.metadata.ensure_rows(rows, paths)
 
-        self.current_index = 0
-        self.show_current_image()
+        # Row baru yang belum punya metadata baru cocok dengan query metadata setelah diisi
+        for row in self.metadata.filter_rows(array('I', rows), self.current_query, self.image_files.table):
+            self.filtered_files.append_row(row)
+            self.availability.append(AVAILABLE)
+        self.filter_cache = {}
+        self.start_metadata_fill()  # Header dibaca paralel selagi validasi masih berjalan
+        if self.thumbnail_packs is not None:
+            self.thumbnail_packs.schedule(paths, self.session_token)
+
+        if was_empty and self.filtered_files:
+            # Gambar pertama siap, tampilkan tanpa menunggu validasi selesai
+            self.current_index = 0
+            self.show_loading(False)
+            self.show_current_image(self.filtered_files)
+        elif self.current_index == last_index:
+            # Perbarui preview berikutnya yang sebelumnya kosong
+            self.show_current_image(self.filtered_files)
+        elif self.filtered_files:
+            self.position_info_label.setText(f"{self.current_index + 1}/{len(self.filtered_files)}")
 
     def get_images_from_folder(self, folder):
-        supported_formats = ('*.png', '*.jpg', '*.jpeg', '*.gif', '*.bmp', '*.webp', '*.tiff', '*.heic', '*.heif', '*.raw', '*.psd')
-        all_files = []
-        for ext in supported_formats:
-            all_files.extend(glob(os.path.join(folder, ext)))
-        return all_files
+        return list_image_files(folder)
 
     def is_image_file(self, path):
-        supported_formats = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.tiff', '.heic', '.heif', '.raw', '.psd')
-        ext = os.path.splitext(path)[1].lower()
-        return ext in supported_formats
+        return is_supported_image(path)
 
     def apply_theme(self):
         settings = load_settings()
@@ -1399,8 +1830,18 @@ class ImageSorterApp(QMainWindow):
 
         self.import_folder_common(folder_path)
 
-    def process_valid_images_and_update_ui(self, folder_path):
-        self.image_files = self.thread.valid_images
+    def process_valid_images_and_update_ui(self, folder_path, thread=None, watch_folders=None):
+        if thread is not None and thread is not self.thread:
+            self.release_import_thread(thread)  # Import lama selesai setelah import baru dimulai
+            return
+        self.is_importing = False
+        self.start_metadata_fill()  # Setelah metadata dan kunci urut siap, sesi diurutkan (on_metadata_finished)
+        if thread is not None and thread.token.cancelled:
+            self.show_loading(False)
+            self.position_stack.setCurrentIndex(0)
+            self.show_current_image(self.filtered_files)
+            self.show_notification(f"Import cancelled: {len(self.image_files)} images loaded.")
+            return
         if not self.image_files:
             self.show_loading(False)
             self.position_stack.setCurrentIndex(0)
@@ -1412,18 +1853,252 @@ class ImageSorterApp(QMainWindow):
             msg.exec()
             return
 
-        # Initialize file existence cache
-        self.file_exists_cache = {path: os.path.exists(path) for path in self.image_files}
-        self.image_cache[folder_path] = self.image_files.copy()
-        
-        self.current_index = 0
-        self.nav_history = []
-        self.source_info = f"Files successfully imported from: {folder_path}"
-        self.apply_filter()
+        if watch_folders == [folder_path] and thread is not None:
+            # Hanya import satu folder utuh; tabel metadata ikut tertahan selama entri ada di cache
+            self.folder_listings.put(folder_path, self.image_files, thread.dir_mtimes, self.metadata.nbytes())
+            print(f"[DEBUG] Folder listing cache: {self.folder_listings.summary()}")
+        self.filter_cache[self.last_filter] = self.filtered_files[:]
+        table = self.image_files.table
+        print(f"[DEBUG] Path table: {len(table)} paths, {table.nbytes() / 1e6:.1f} MB")
+
+        if watch_folders is not None and len(watch_folders) > 1:
+            self.source_info = f"Files successfully imported from {len(watch_folders)} folders under: {folder_path}"
+        else:
+            self.source_info = f"Files successfully imported from: {folder_path}"
         self.show_notification(self.source_info)
         self.show_current_image(self.filtered_files)
         self.show_loading(False)
         self.position_stack.setCurrentIndex(0)
+        if watch_folders:
+            self.start_watching(watch_folders, thread.dir_mtimes if thread is not None else None)
+
+    def start_watching(self, folders, dir_mtimes=None):
+        """
+        Pantau folder sumber agar file baru/dihapus langsung masuk ke sesi.
+        Pada import rekursif, setiap subfolder yang berisi gambar ikut dipantau.
+        `dir_mtimes` (mtime sebelum scan import) membuat perubahan selama import ikut terdeteksi.
+        """
+        self.watched_folder = folders[0] if len(folders) == 1 else None  # Kunci folder_listings sesi ini
+        roots = tuple(os.path.join(folder, "") for folder in folders)
+        # Subfolder (import rekursif) ikut dipantau; folder asal file yang di-drop satu per satu tidak
+        folders = list(folders) + [folder for folder in self.image_files.table.folders()
+                                   if folder.startswith(roots) and folder not in folders]
+        self.folder_watcher.watch(folders, dir_mtimes)
+
+    def stop_watching(self):
+        self.watched_folder = None
+        self.folder_watcher.stop()
+
+    def on_folder_contents_changed(self, folder, paths):
+        """Terapkan perubahan folder sumber (file dibuat, dihapus, atau di-rename) ke sesi aktif."""
+        if folder not in self.folder_watcher.folders:
+            return
+        self.stat_cache.invalidate_folder(folder)  # Isi folder berubah: hasil cek file lama tidak berlaku
+        if self.is_importing:
+            return
+        # Diff lewat hash path yang sudah tersimpan di PathTable, tanpa membuat ulang string sesi
+        table = self.image_files.table
+        folder_rows = table.rows_in_folder(self.image_files.rows, folder)
+        disk_hashes = set(map(hash, paths))
+        session_hashes = {table.hash_of(row) for row in folder_rows}
+        # File yang hilang karena pemindahan kita sendiri (atau masih antre) bukan penghapusan
+        removed = [table.path(row) for row in folder_rows if table.hash_of(row) not in disk_hashes]
+        removed = [path for path in removed
+                   if not self.history.get(path) and self.move_queue.pending_source(path) is None]
+        added = [path for path in paths if hash(path) not in session_hashes and path not in self.rejected_paths]
+        reappeared = [path for path in self.missing_paths if hash(path) in disk_hashes]
+        if not (removed or added or reappeared):
+            return
+        print(f"[DEBUG] Folder changed: {len(added)} added, {len(removed)} removed, {len(reappeared)} reappeared")
+        self.folder_listings.pop(self.watched_folder)
+        for path in reappeared:
+            self.mark_path_state(path, AVAILABLE)
+        if removed:
+            self.remove_session_images(removed)
+        elif reappeared:
+            self.show_current_image(self.filtered_files)
+        if added:
+            self.validate_watched_files(folder, added)
+
+    def validate_watched_files(self, folder, paths):
+        settings = load_settings()
+        thread = ImageValidationThread(paths, folder_path=folder,
+                                       max_workers=settings.get("validation_workers", 0),
+                                       token=self.session_token)
+        thread.images_found.connect(lambda valid, f=folder: self.add_watched_images(f, valid))
+        thread.finished.connect(lambda t=thread: self.on_watch_validation_finished(t))
+        self.watch_threads.append(thread)
+        thread.start()
+
+    def add_watched_images(self, folder, paths):
+        if folder not in self.folder_watcher.folders:
+            return
+        paths = [path for path in paths if path not in self.image_files]
+        if paths:
+            self.append_valid_images(paths, reuse_rows=True)
+            self.log_message(f"Detected {len(paths)} new image(s) in {folder}")
+
+    def on_watch_validation_finished(self, thread):
+        if thread in self.watch_threads:
+            self.watch_threads.remove(thread)
+        if thread.folder_path in self.folder_watcher.folders and not thread.token.cancelled:
+            # images_found selalu diterima sebelum finished, jadi file valid sudah masuk sesi
+            self.rejected_paths.update(path for path in thread.files if path not in self.image_files)
+
+    def remove_session_images(self, paths):
+        """Buang gambar yang dihapus/di-rename dari luar aplikasi dari semua daftar sesi."""
+        table = self.image_files.table
+        gone = {row for row in map(table.find, paths) if row is not None}
+        old_index = self.current_index
+        kept_before = sum(1 for row in self.filtered_files.rows[:old_index] if row not in gone)
+        self.image_files = self.image_files.without_rows(gone)
+        self.filtered_files = self.filtered_files.without_rows(gone)
+        self.filter_cache = {key: files.without_rows(gone) for key, files in self.filter_cache.items()}
+        self.missing_paths.difference_update(paths)
+        self.rebuild_availability()
+        self.nav_history = []
+        # Gambar yang sedang tampil tetap dipilih; jika ikut terhapus, pindah ke gambar setelahnya
+        self.current_index = min(kept_before, len(self.filtered_files) - 1) if self.filtered_files else 0
+        self.stat_cache.invalidate(*paths)
+        self.show_current_image(self.filtered_files)
+
+    def metadata_for(self, table):
+        """Tabel metadata milik `table`; ikut tersimpan selama daftar folder masih di cache."""
+        metadata = self.metadata_tables.get(table)
+        if metadata is None:
+            metadata = self.metadata_tables[table] = MetadataTable()
+        return metadata
+
+    def start_metadata_fill(self):
+        """Baca metadata gambar yang belum dimuat di thread latar belakang."""
+        if self.metadata_thread is not None:
+            self.metadata_refill = True  # Jalankan lagi setelah thread aktif selesai
+            return
+        rows = array('I', self.metadata.unloaded_rows(self.image_files.rows))
+        rank_names = not self.is_importing and not has_natural_ranks(self.image_files.table)
+        if not rows and not (rank_names and self.image_files):
+            return
+        thread = MetadataThread(self.image_files.table, rows, token=self.session_token,
+                                index_path=get_folder_index_path(), rank_names=rank_names)
+        thread.metadata_ready.connect(lambda batch, t=thread: self.on_metadata_ready(batch, t))
+        thread.finished.connect(lambda t=thread: self.on_metadata_finished(t))
+        self.metadata_thread = thread
+        thread.start()
+
+    def on_metadata_ready(self, batch, thread):
+        if thread is not self.metadata_thread:
+            return
+        for row, *metadata in batch:
+            self.metadata.set_row(row, *metadata)
+
+    def on_metadata_finished(self, thread):
+        if thread in self.retired_threads:
+            self.retired_threads.remove(thread)
+        if thread is not self.metadata_thread:
+            return
+        self.metadata_thread = None
+        print(f"[DEBUG] Metadata loaded for {self.metadata.loaded_count}/{len(self.metadata)} images")
+        if self.metadata_refill:
+            self.metadata_refill = False
+            self.start_metadata_fill()
+        if self.metadata_thread is None and not self.is_importing:
+            self.apply_session_order()  # Sekaligus mengevaluasi ulang filter
+        elif self.current_query.uses_metadata:
+            self.refresh_filter()
+
+    def set_session_order(self, order):
+        """Pilihan menu View > Sort By."""
+        self.session_order = order
+        settings = load_settings()
+        settings["session_order"] = order
+        save_settings(settings)
+        self.apply_session_order()
+        if order in METADATA_ORDERS and self.metadata.loaded_count < len(self.metadata):
+            self.show_notification(
+                f"Reading image metadata ({self.metadata.loaded_count}/{len(self.metadata)}), order will update.")
+
+    def apply_session_order(self):
+        """
+        Urutkan ulang image_files sesuai session_order lalu terapkan ulang filter; gambar aktif tetap dipilih.
+        Kunci urut sudah berupa kolom (tabel metadata dan peringkat nama), jadi ini hanya satu argsort.
+        """
+        if not self.image_files:
+            return
+        start = time.perf_counter()
+        table = self.image_files.table
+        self.image_files = PathList(table, order_rows(self.image_files.rows, self.session_order, self.metadata, table))
+        self.nav_history = []  # Berisi indeks daftar lama
+        # Sesi yang baru di-import tampil dulu dalam urutan scan; selama pengguna belum berpindah
+        # gambar, mulai dari gambar pertama urutan baru agar tidak ada gambar yang terlewat
+        self.refresh_filter(keep_current=self.user_navigated)
+        print(f"[DEBUG] Session ordered by {self.session_order}: {len(self.image_files)} images "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def describe_metadata(self, row, path):
+        """Teks info singkat (dimensi, megapiksel, ukuran, tanggal) dari tabel metadata."""
+        if row < len(self.metadata) and not self.metadata.loaded[row]:
+            # Belum diisi thread latar belakang: baca header gambar ini saja (beberapa KB)
+            metadata = read_metadata(path)
+            if metadata is not None:
+                self.metadata.set_row(row, *metadata)
+        if row >= len(self.metadata) or not self.metadata.loaded[row]:
+            return ""
+        width, height = self.metadata.width[row], self.metadata.height[row]
+        if self.metadata.orientation[row] >= 5:
+            width, height = height, width  # Tampilkan sesuai orientasi EXIF
+        parts = []
+        if width and height:
+            parts.append(f"{width}×{height} ({width * height / 1_000_000:.1f} MP)")
+        parts.append(format_file_size(self.metadata.size[row]))
+        if self.metadata.taken[row]:
+            parts.append(time.strftime("%Y-%m-%d %H:%M", time.gmtime(self.metadata.taken[row])))
+        return "  ·  ".join(parts)
+
+    def display_name(self, path):
+        """Nama file untuk ditampilkan; file dari subfolder (import rekursif) memakai path relatif."""
+        folder = os.path.dirname(path)
+        if self.session_root and folder != self.session_root and folder.startswith(os.path.join(self.session_root, "")):
+            return os.path.relpath(path, self.session_root)
+        return os.path.basename(path)
+
+    def toggle_recursive_import(self, checked):
+        settings = load_settings()
+        settings["recursive_import"] = checked
+        save_settings(settings)
+        self.folder_listings.clear()  # Daftar folder di cache dibuat dengan mode sebelumnya
+        self.log_message(f"Include subfolders on import: {'on' if checked else 'off'}")
+
+    def current_filter_query(self):
+        """Parse teks query bar; teks yang tidak valid diperlakukan sebagai All Files."""
+        try:
+            return parse_query(self.filter_combo.currentText())
+        except ValueError:
+            return parse_query(ALL_FILES)
+
+    def apply_query_bar(self):
+        """Enter di query bar: terapkan filter lalu kembalikan fokus agar shortcut navigasi aktif lagi."""
+        self.apply_filter()
+        self.setFocus()
+
+    def refresh_filter(self, keep_current=True):
+        """
+        Evaluasi ulang query aktif (misalnya setelah metadata selesai dimuat); gambar aktif tetap dipilih,
+        atau kembali ke gambar pertama jika `keep_current` False.
+        """
+        if keep_current and self.current_index < len(self.filtered_files):
+            current_path = self.filtered_files[self.current_index]
+        else:
+            current_path = None
+            self.current_index = 0
+        self.filter_cache = {}
+        self.last_filter = None
+        self.defer_ui_updates = True
+        self.apply_filter()
+        self.defer_ui_updates = False
+        index = self.position_of(current_path) if current_path is not None else None
+        if index is not None:
+            self.current_index = index
+        self.show_current_image(self.filtered_files)
 
     def init_ui(self):
         central_widget = QWidget()
@@ -1462,6 +2137,11 @@ class ImageSorterApp(QMainWindow):
         self.file_info_label.setFixedHeight(30)
         self.file_info_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
 
+        self.file_meta_label = QLabel("")
+        self.file_meta_label.setStyleSheet("font-size: 12px; padding: 5px;")
+        self.file_meta_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.file_meta_label.setFixedHeight(30)
+
         self.position_container = QWidget()
         self.position_stack = QStackedLayout(self.position_container)
         self.position_container.setFixedHeight(30)
@@ -1473,6 +2153,12 @@ class ImageSorterApp(QMainWindow):
         self.file_info_label.setFixedHeight(30)
         self.position_info_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
 
+        # Tombol Cancel di samping progress bar: tetap terlihat selama import berjalan,
+        # juga setelah overlay loading ditutup saat gambar pertama sudah tampil
+        self.import_cancel_btn = QPushButton("Cancel")
+        self.import_cancel_btn.setFixedHeight(30)
+        self.import_cancel_btn.clicked.connect(self.cancel_import)
+
         self.progress_bar = QProgressBar()
         self.progress_bar.setMinimum(0)
         self.progress_bar.setMaximum(100)
@@ -1482,11 +2168,18 @@ class ImageSorterApp(QMainWindow):
         self.progress_bar.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
         self.progress_bar.setFixedHeight(30)
 
+        self.progress_container = QWidget()
+        progress_layout = QHBoxLayout(self.progress_container)
+        progress_layout.setContentsMargins(0, 0, 0, 0)
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.import_cancel_btn)
+
         self.position_stack.addWidget(self.position_info_label)
-        self.position_stack.addWidget(self.progress_bar)
+        self.position_stack.addWidget(self.progress_container)
         self.position_stack.setCurrentIndex(0)
 
         info_layout.addWidget(self.file_info_label)
+        info_layout.addWidget(self.file_meta_label)
         info_layout.addWidget(self.position_container)
 
         info_layout.setStretch(0, 8)
@@ -1521,10 +2214,19 @@ class ImageSorterApp(QMainWindow):
         action_layout = QHBoxLayout()
         action_layout.setSpacing(10)
         self.filter_combo = QComboBox()
-        self.filter_combo.setToolTip("Select file extension to filter")
-        self.filter_combo.addItem("All Files")
+        self.filter_combo.setToolTip(
+            "Select a file extension or type a query and press Enter, e.g.\n"
+            ".jpg size>2mb width>=1920 mp>=12 date:2023 date>=2022-06\n"
+            "orientation:portrait name:IMG_* (all terms must match)")
+        self.filter_combo.setEditable(True)
+        self.filter_combo.setInsertPolicy(QComboBox.NoInsert)
+        self.filter_combo.addItem(ALL_FILES)
         self.filter_combo.addItems([".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".tiff", ".heic", ".heif", ".raw", ".psd"])
-        self.filter_combo.currentIndexChanged.connect(self.apply_filter)
+        self.filter_combo.addItems(["orientation:portrait", "orientation:landscape", "size>5mb"])
+        self.filter_combo.lineEdit().setPlaceholderText("Filter query")
+        self.filter_combo.lineEdit().returnPressed.connect(self.apply_query_bar)
+        # Preset dari dropdown: fokus dikembalikan ke jendela agar shortcut navigasi tidak mengetik ke query
+        self.filter_combo.currentIndexChanged.connect(lambda index: self.apply_query_bar())
         action_layout.addWidget(self.filter_combo)
         self.filter_combo.setCurrentIndex(0)
 
@@ -1581,6 +2283,12 @@ class ImageSorterApp(QMainWindow):
         export_action.setToolTip("Export activity log to text file")
         export_action.triggered.connect(self.export_log)
         file_menu.addAction(export_action)
+        self.recursive_import_action = QAction("Include Subfolders", self)
+        self.recursive_import_action.setToolTip("Also import images from all subfolders of the imported folder")
+        self.recursive_import_action.setCheckable(True)
+        self.recursive_import_action.setChecked(load_settings().get("recursive_import", False))
+        self.recursive_import_action.toggled.connect(self.toggle_recursive_import)
+        file_menu.addAction(self.recursive_import_action)
         self.recent_folders_menu = file_menu.addMenu("Recent Folders")
         self.recent_folders_menu.setIcon(QIcon(resource_path("assets/icons/recent_folder.png")))
         self.update_recent_folders_menu()
@@ -1615,6 +2323,18 @@ class ImageSorterApp(QMainWindow):
         view_menu.addAction(self.dark_action)
         view_menu.addAction(self.system_action)
 
+        view_menu.addSeparator()
+        sort_menu = view_menu.addMenu("Sort By")
+        self.sort_actions = QActionGroup(self)
+        self.sort_actions.setExclusive(True)
+        for order, label in ORDERS.items():
+            action = QAction(label, self)
+            action.setCheckable(True)
+            action.setChecked(order == self.session_order)
+            action.triggered.connect(lambda checked, o=order: self.set_session_order(o))
+            self.sort_actions.addAction(action)
+            sort_menu.addAction(action)
+
         settings_menu = menu_bar.addMenu("Settings")
         settings_action = QAction("Folder Settings", self)
         settings_action.setIcon(QIcon(resource_path("assets/icons/folder.png")))
@@ -1694,31 +2414,7 @@ class ImageSorterApp(QMainWindow):
         if not os.path.isdir(folder_path):
             return
 
-        self.show_loading(True)
-
-        supported_formats = ('*.png', '*.jpg', '*.jpeg', '*.gif', '*.bmp', '*.webp',
-                            '*.tiff', '*.heic', '*.heif', '*.raw', '*.psd')
-        all_files = []
-        for ext in supported_formats:
-            all_files.extend(glob(os.path.join(folder_path, ext)))
-
-        if not all_files:
-            self.show_loading(False)
-            msg = QMessageBox()
-            msg.setWindowTitle("No Images")
-            msg.setText("No valid images found in this folder.")
-            msg.setIcon(QMessageBox.Warning)
-            self.apply_message_box_style(msg)
-            msg.exec()
-            return
-
-        self.thread = ImageValidationThread(all_files)
-        self.thread.finished.connect(lambda: self.process_valid_images_and_update_ui(folder_path))
-        self.thread.start()
-        self.image_files = all_files
-        self.apply_filter()
-
-        self.update_recent_folders(folder_path)
+        self.import_folder_common(folder_path)
 
     def update_progress_bar_style(self):
         is_dark = self.theme_mode == "dark" or (self.theme_mode == "system" and self.is_system_dark())
@@ -1748,6 +2444,17 @@ class ImageSorterApp(QMainWindow):
                 border-radius: 4px;
             }}
         """)
+        self.import_cancel_btn.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {bg_color};
+                color: {text_color};
+                border: 1px solid {text_color};
+                border-radius: 5px;
+                font-size: 12px;
+                font-weight: bold;
+                padding: 0px 12px;
+            }}
+        """)
 
     def toggle_dark_mode(self, enable):
         self.dark_mode = enable
@@ -1853,6 +2560,7 @@ class ImageSorterApp(QMainWindow):
         settings = load_settings()
         self.folder_names = settings.get("folder_names", ["Folder A", "Folder B", "Folder C", "Folder D", "Folder E"])
         self.folder_paths = settings.get("folder_paths", ["output/A", "output/B", "output/C", "output/D", "output/E"])
+        self.history.set_folders(self.folder_names, self.folder_paths)
         print(f"[DEBUG] Loaded folder_names: {self.folder_names}")
         print(f"[DEBUG] Loaded folder_paths: {self.folder_paths}") 
 
@@ -1994,10 +2702,6 @@ class ImageSorterApp(QMainWindow):
 
         self.import_folder_common(folder_path)
 
-    def process_valid_images_and_hide_loading(self):
-        self.process_valid_images()
-        self.show_loading(False)
-
     def show_loading(self, show=True):
         if show:
             # Sinkronkan gaya dengan tema
@@ -2031,20 +2735,21 @@ class ImageSorterApp(QMainWindow):
             self.loading_widget.hide()
 
     def get_new_path_from_history(self, path):
-        normalized_path = os.path.normcase(os.path.normpath(path))
-        return self.history_cache.get(normalized_path, None)
+        return self.history.get(path)
 
     def show_current_image(self, files=None):
         if self.defer_ui_updates:
             return  # Skip UI update during rapid operations
 
-        self.position_stack.setCurrentIndex(0)
+        if not self.is_importing:
+            self.position_stack.setCurrentIndex(0)
         if files is None:
             files = self.filtered_files or self.image_files
         if not files:
             self.image_label.setText("No Image Loaded")
             self.next_image_label.setText("Next: None")
             self.file_info_label.setText("No image loaded.")
+            self.file_meta_label.setText("")
             self.position_info_label.setText("")
             self.image_label.setFixedSize(450, 500)
             self.next_image_label.setFixedSize(250, 310)
@@ -2056,7 +2761,7 @@ class ImageSorterApp(QMainWindow):
                 return
 
         path = files[self.current_index]
-        filename = os.path.basename(path)
+        filename = self.display_name(path)
         folder_name = self.get_folder_name_from_history(path)
         new_path = self.get_new_path_from_history(path) or path
         is_moved = folder_name is not None
@@ -2064,6 +2769,7 @@ class ImageSorterApp(QMainWindow):
         moved_status = f" <span style='color: red; font-weight: bold;'>(moved to {folder_name})</span>" if is_moved else ""
         self.file_info_label.setText(f"{filename}{moved_status}")
         self.file_info_label.setToolTip(self.file_info_label.text())
+        self.file_meta_label.setText(self.describe_metadata(files.row(self.current_index), new_path))
 
         current_pos = self.current_index + 1
         total_files = len(files)
@@ -2072,14 +2778,14 @@ class ImageSorterApp(QMainWindow):
         for child in self.image_label.findChildren(QLabel):
             child.deleteLater()
 
-        # Use cached file existence
-        file_exists = self.file_exists_cache.get(new_path, os.path.exists(new_path))
-        self.file_exists_cache[new_path] = file_exists
+        # Cukup satu stat (di dalam cache preview); hanya cek keberadaan jika gagal dimuat
+        resized_pixmap = self.load_preview_pixmap(new_path, MAIN_PREVIEW)
+        file_exists = resized_pixmap is not None or self.path_exists(new_path)
+        if not file_exists:
+            self.mark_path_state(path, MISSING)
 
         if file_exists:
-            pixmap = QPixmap(new_path)
-            if not pixmap.isNull():
-                resized_pixmap = resize_image(pixmap)
+            if resized_pixmap is not None:
                 self.image_label.setPixmap(resized_pixmap)
                 self.image_label.setFixedSize(resized_pixmap.size())
                 if is_moved:
@@ -2112,26 +2818,54 @@ class ImageSorterApp(QMainWindow):
         if next_index is not None:
             next_path = files[next_index]
             new_next_path = self.get_new_path_from_history(next_path) or next_path
-            # Use cached file existence
-            next_file_exists = self.file_exists_cache.get(new_next_path, os.path.exists(new_next_path))
-            self.file_exists_cache[new_next_path] = next_file_exists
-
-            if next_file_exists:
-                next_pixmap = QPixmap(new_next_path)
-                if not next_pixmap.isNull():
-                    resized_next = resize_next_preview(next_pixmap)
-                    self.next_image_label.setPixmap(resized_next)
-                    self.next_image_label.setFixedSize(resized_next.size())
-                else:
-                    self.next_image_label.setText("Next\nImage")
-                    self.next_image_label.setFixedSize(250, 310)
+            # Indeks berikutnya sudah dipilih dari peta status, tidak perlu cek keberadaan lagi
+            resized_next = self.load_preview_pixmap(new_next_path, NEXT_PREVIEW)
+            if resized_next is not None:
+                self.next_image_label.setPixmap(resized_next)
+                self.next_image_label.setFixedSize(resized_next.size())
             else:
+                if not self.path_exists(new_next_path):
+                    self.mark_path_state(next_path, MISSING)
                 self.next_image_label.setText("Next\nImage")
                 self.next_image_label.setFixedSize(250, 310)
         else:
             self.next_image_label.setText("Next\nImage")
             self.next_image_label.setFixedSize(250, 310)
 
+        self.schedule_prefetch(files)
+
+    def schedule_prefetch(self, files):
+        """
+        Prefetch N gambar berikutnya sesuai arah navigasi terakhir; keberadaan file
+        dalam jendela yang sedikit lebih lebar di-stat sekaligus di latar belakang.
+        """
+        paths = []
+        index = self.current_index
+        while len(paths) < max(self.prefetcher.count, self.STAT_REFRESH_WINDOW):
+            if self.nav_direction > 0:
+                index = self.find_valid_next_index(index, files)
+            else:
+                index = self.find_valid_previous_index(index, files)
+            if index is None:
+                break
+            path = files[index]
+            paths.append(self.get_new_path_from_history(path) or path)
+        self.prefetcher.schedule(paths, self.session_token)  # Hanya `count` path pertama
+        self.stat_cache.refresh(paths)
+
+    def load_preview_pixmap(self, path, kind):
+        """Ambil preview yang sudah di-resize dari cache LRU; decode hanya saat cache miss."""
+        # File yang masih antre dipindahkan dibaca dari lokasi lamanya
+        pending = self.move_queue.pending_source(path)
+        while pending is not None:
+            path = pending
+            pending = self.move_queue.pending_source(path)
+        self.prefetcher.wait(path)
+        image = self.preview_cache.get_or_load(path, kind)
+        if image is None:
+            return None
+        return QPixmap.fromImage(image)
+
     def apply_info_style(self, label):
         if self.theme_mode == "dark" or (self.theme_mode == "system" and self.is_system_dark()):
             label.setStyleSheet("""
@@ -2149,39 +2883,75 @@ class ImageSorterApp(QMainWindow):
             """)
 
     def get_folder_name_from_history(self, path):
-        normalized_path = os.path.normcase(os.path.normpath(path))
-        dest_path = self.history_cache.get(normalized_path)
+        dest_path = self.history.get(path)
         if not dest_path:
             return None
-        dest_folder = os.path.dirname(dest_path)
-        norm_dest_folder = os.path.normcase(os.path.normpath(dest_folder))
-        for i, folder_path in enumerate(self.folder_paths):
-            norm_folder_path = os.path.normcase(os.path.normpath(folder_path))
-            if norm_dest_folder.startswith(norm_folder_path):
-                return self.folder_names[i]
-        return os.path.basename(os.path.normpath(dest_folder))
+        return self.history.folder_name(dest_path)
+
+    def path_exists(self, path):
+        """File ada di disk, atau sedang menunggu di antrian pemindahan menuju `path`."""
+        return self.stat_cache.exists(path) or self.move_queue.pending_source(path) is not None
+
+    def rebuild_availability(self):
+        """Bangun ulang peta status untuk filtered_files (dipanggil saat daftar diganti)."""
+        self.availability = AvailabilityMap(len(self.filtered_files))
+        if self.history or self.missing_paths:
+            # History persisten bisa jauh lebih besar dari sesi: telusuri sisi yang lebih kecil
+            if len(self.history) < len(self.filtered_files):
+                for src, _ in self.history:
+                    index = self.position_of(src)
+                    if index is not None:
+                        self.availability.set_state(index, MOVED)
+            else:
+                for index, path in enumerate(self.filtered_files):
+                    if self.history.get(path):
+                        self.availability.set_state(index, MOVED)
+            for path in self.missing_paths:
+                index = self.position_of(path)
+                if index is not None:
+                    self.availability.set_state(index, MISSING)
+
+    def position_of(self, path):
+        """Indeks `path` di filtered_files (lewat PathTable, tanpa dict string per sesi)."""
+        return self.filtered_files.position(path)
+
+    def mark_path_state(self, path, state):
+        """Perbarui status gambar (AVAILABLE / MOVED / MISSING) setelah pemindahan, undo, atau event file."""
+        if state == MISSING:
+            self.missing_paths.add(path)
+        else:
+            self.missing_paths.discard(path)
+        index = self.position_of(path)
+        if index is not None:
+            self.availability.set_state(index, state)
 
     def find_valid_next_index(self, start_index, files=None):
         if files is None:
             files = self.filtered_files or self.image_files
+        if files is self.filtered_files:
+            return self.availability.next_index(start_index)
         for i in range(start_index + 1, len(files)):
             path = files[i]
             new_path = self.get_new_path_from_history(path) or path
-            if os.path.exists(new_path):
+            if self.stat_cache.exists(new_path) or self.move_queue.pending_source(new_path):
                 return i
         return None
 
     def find_valid_previous_index(self, start_index, files=None):
         if files is None:
             files = self.filtered_files or self.image_files
+        if files is self.filtered_files:
+            return self.availability.previous_index(start_index)
         for i in range(start_index - 1, -1, -1):
             path = files[i]
             # Check if file exists in original or new location
-            if os.path.exists(path) or self.get_new_path_from_history(path):
+            if self.stat_cache.exists(path) or self.get_new_path_from_history(path) or self.move_queue.pending_source(path):
                 return i
         return None
 
     def show_previous(self):
+        self.nav_direction = -1
+        self.user_navigated = True
         valid_index = self.find_valid_previous_index(self.current_index, self.filtered_files)
         if valid_index is not None:
             self.nav_history.append(self.current_index)
@@ -2191,6 +2961,8 @@ class ImageSorterApp(QMainWindow):
             self.show_notification("No valid previous image.")
 
     def show_next(self):
+        self.nav_direction = 1
+        self.user_navigated = True
         valid_index = self.find_valid_next_index(self.current_index, self.filtered_files)
         if valid_index is not None:
             self.nav_history.append(self.current_index)
@@ -2201,26 +2973,17 @@ class ImageSorterApp(QMainWindow):
         else:
             self.show_notification("No valid next image.")
 
-    def validate_history(self):
-        valid_history = []
-        seen_src = set()
-        for src, dest in self.history:
-            norm_src = os.path.normcase(os.path.normpath(src))
-            if norm_src not in seen_src:
-                valid_history.append((src, dest))
-                seen_src.add(norm_src)
-        self.history = valid_history
-        print(f"[DEBUG] Validated history: {self.history}")
-
     def move_to_custom_folder(self, folder_path):
+        self.user_navigated = True
         if not self.image_files or self.current_index >= len(self.filtered_files):
             self.show_notification("No image to move.")
             return
 
         self.defer_ui_updates = True  # Defer UI updates during move
 
-        src_path = self.image_files[self.current_index]
-        if not os.path.exists(src_path) and not self.get_new_path_from_history(src_path):
+        src_path = self.filtered_files[self.current_index]
+        if (not self.stat_cache.exists(src_path) and not self.get_new_path_from_history(src_path)
+                and not self.move_queue.pending_source(src_path)):
             self.show_notification("Source file not found.")
             self.show_next()
             self.defer_ui_updates = False
@@ -2269,75 +3032,131 @@ class ImageSorterApp(QMainWindow):
         if current_dest:
             current_dest_folder = os.path.normcase(os.path.normpath(os.path.dirname(current_dest)))
             if norm_dest_folder == current_dest_folder:
-                folder_name = os.path.basename(os.path.normpath(dest_folder))
-                for name, path in zip(self.folder_names, self.folder_paths):
-                    if os.path.normcase(os.path.normpath(path)) == norm_dest_folder:
-                        folder_name = name
-                        break
+                folder_name = self.history.folder_name(current_dest)
                 self.show_notification(f"File already in {folder_name}.")
                 self.defer_ui_updates = False
                 return
 
-        os.makedirs(dest_folder, exist_ok=True)
-        filename = os.path.basename(src_path)
-        dest_path = os.path.join(dest_folder, filename)
-
-        try:
-            source_to_move = current_dest if current_dest and os.path.exists(current_dest) else src_path
-            if not os.path.exists(source_to_move):
-                raise FileNotFoundError(f"File {source_to_move} not found.")
-
-            shutil.move(source_to_move, dest_path)
-
-            # Update history and cache
-            norm_src_path = os.path.normcase(os.path.normpath(src_path))
-            self.history = [(s, d) for s, d in self.history if os.path.normcase(os.path.normpath(s)) != norm_src_path]
-            self.history.append((src_path, dest_path))
-            self.history_cache[norm_src_path] = dest_path
-            save_history(self.history)
-
-            # Update file existence cache
-            self.file_exists_cache[src_path] = False
-            self.file_exists_cache[dest_path] = True
-
-            self.log_message(f"Moved: {source_to_move} → {dest_path}")
+        dest_path = self.unique_dest_path(dest_folder, os.path.basename(src_path))
 
-            # Simpan indeks saat ini sebelum apply_filter
-            current_index_before_move = self.current_index
+        # Lokasi logis file saat ini; bisa saja masih menunggu di antrian pemindahan
+        if current_dest and (self.move_queue.pending_source(current_dest) or self.stat_cache.exists(current_dest)):
+            source_to_move = current_dest
+        else:
+            source_to_move = src_path
 
-            self.apply_filter()
+        # Perbarui history secara optimis, pemindahan fisik dikerjakan di latar belakang
+        self.set_history_entry(src_path, dest_path)
+        # File masih berada di sumber sampai job selesai; cek berikutnya langsung ke disk
+        self.stat_cache.invalidate(source_to_move, dest_path)
+        self.track_move_job(self.move_queue.submit(source_to_move, dest_path), src_path)
 
-            # Pulihkan current_index ke indeks berikutnya yang valid
-            self.current_index = self.find_valid_next_index(current_index_before_move, self.filtered_files)
-            if self.current_index is None:
-                self.current_index = min(current_index_before_move, len(self.filtered_files) - 1) if self.filtered_files else 0
+        # Simpan indeks saat ini sebelum apply_filter
+        current_index_before_move = self.current_index
 
-            folder_name = os.path.basename(os.path.normpath(folder_path))
-            for name, path in zip(self.folder_names, self.folder_paths):
-                if os.path.normcase(os.path.normpath(path)) == norm_dest_folder:
-                    folder_name = name
-                    break
+        self.apply_filter()
+        self.mark_path_state(src_path, MOVED)
 
-            is_second_move = current_dest is not None
+        # Pulihkan current_index ke indeks berikutnya yang valid
+        self.current_index = self.find_valid_next_index(current_index_before_move, self.filtered_files)
+        if self.current_index is None:
+            self.current_index = min(current_index_before_move, len(self.filtered_files) - 1) if self.filtered_files else 0
 
-            # Re-enable UI updates and refresh
-            self.defer_ui_updates = False
-            self.nav_history.append(current_index_before_move)
-            self.show_current_image(self.filtered_files)
+        folder_name = self.history.folder_name(dest_path)
 
-            if is_second_move:
-                self.show_notification(f"Image successfully moved to {folder_name}")
+        # Re-enable UI updates and refresh
+        self.defer_ui_updates = False
+        self.nav_history.append(current_index_before_move)
+        self.show_current_image(self.filtered_files)
+        if os.path.basename(dest_path) != os.path.basename(src_path):
+            # Nama bentrok dengan file lain di tujuan (sesi gabungan / rekursif)
+            self.show_notification(f"Image successfully moved to {folder_name} as {os.path.basename(dest_path)}")
+        else:
+            self.show_notification(f"Image successfully moved to {folder_name}")
+
+    def unique_dest_path(self, dest_folder, filename):
+        """
+        Path tujuan di `dest_folder` yang belum dipakai file lain maupun job yang masih antre.
+        Import rekursif maupun sesi gabungan beberapa folder hasil drop bisa berisi nama yang sama
+        dari folder berbeda (100CANON/IMG_0001.JPG, 101CANON/IMG_0001.JPG); file berikutnya diberi
+        akhiran " (1)", " (2)", ... agar tidak menimpa.
+        """
+        stem, ext = os.path.splitext(filename)
+        dest_path = os.path.join(dest_folder, filename)
+        suffix = 1
+        while self.stat_cache.exists(dest_path) or self.move_queue.pending_source(dest_path) is not None:
+            dest_path = os.path.join(dest_folder, f"{stem} ({suffix}){ext}")
+            suffix += 1
+        return dest_path
+
+    def set_history_entry(self, src_path, dest_path):
+        """Catat (atau ganti) tujuan pemindahan sebuah file di history."""
+        self.history.set(src_path, dest_path)
+
+    def remove_history_entry(self, src_path):
+        self.history.remove(src_path)
+
+    def track_move_job(self, job_id, src_path):
+        """Catat job pemindahan/undo sebagai job terbaru untuk `src_path`."""
+        self.pending_moves[job_id] = src_path
+        self.latest_moves[os.path.normcase(os.path.normpath(src_path))] = job_id
+
+    def pop_move_job(self, job_id):
+        """(path asli, True jika job ini masih job terbaru untuk file tersebut) untuk job yang selesai/gagal."""
+        src_path = self.pending_moves.pop(job_id, None)
+        if src_path is None:
+            return None, False
+        key = os.path.normcase(os.path.normpath(src_path))
+        if self.latest_moves.get(key) != job_id:
+            return src_path, False
+        del self.latest_moves[key]
+        return src_path, True
+
+    def on_move_finished(self, job_id, source, dest, dir_mtimes):
+        self.stat_cache.invalidate(source, dest)
+        for folder, mtime_before, mtime_after in dir_mtimes:
+            # Perubahan folder sumber oleh pemindahan sendiri tidak perlu dipindai ulang oleh watcher
+            self.folder_watcher.note_own_change(folder, mtime_before, mtime_after)
+        src_path, _ = self.pop_move_job(job_id)
+        if src_path is not None and os.path.normcase(os.path.normpath(dest)) == os.path.normcase(os.path.normpath(src_path)):
+            self.log_message(f"Undo: {source} → {dest}")
+        else:
+            self.log_message(f"Moved: {source} → {dest}")
+
+    def on_move_failed(self, job_id, source, dest, error):
+        """
+        Kembalikan history ke lokasi file yang sebenarnya setelah job gagal.
+        Jika sudah ada job yang lebih baru untuk file yang sama, history dibiarkan:
+        hasil job terbaru itulah yang menentukan lokasi akhir file.
+        """
+        src_path, latest = self.pop_move_job(job_id)
+        if src_path is None:
+            return
+        self.stat_cache.invalidate(source, dest, src_path)
+        if latest:
+            # Cek di disk di mana file sebenarnya berada sebelum menulis ke journal
+            if self.stat_cache.exists(source):
+                if os.path.normcase(os.path.normpath(source)) == os.path.normcase(os.path.normpath(src_path)):
+                    self.remove_history_entry(src_path)
+                    self.mark_path_state(src_path, AVAILABLE)
+                else:
+                    self.set_history_entry(src_path, source)
+                    self.mark_path_state(src_path, MOVED)
+            elif self.stat_cache.exists(src_path):
+                self.remove_history_entry(src_path)
+                self.mark_path_state(src_path, AVAILABLE)
             else:
-                self.show_notification(f"Image successfully moved to {folder_name}")
+                self.remove_history_entry(src_path)
+                self.mark_path_state(src_path, MISSING)
+        self.log_message(f"Move Error: {source} → {dest}: {error}")
+        self.show_current_image(self.filtered_files)
 
-        except Exception as e:
-            msg = QMessageBox()
-            msg.setWindowTitle("Error")
-            msg.setText(f"Could not move file:\n{str(e)}")
-            msg.setIcon(QMessageBox.Critical)
-            self.apply_message_box_style(msg)
-            msg.exec()
-            self.defer_ui_updates = False
+        msg = QMessageBox()
+        msg.setWindowTitle("Error")
+        msg.setText(f"Could not move file:\n{error}")
+        msg.setIcon(QMessageBox.Critical)
+        self.apply_message_box_style(msg)
+        msg.exec()
 
     def undo_action(self):
         if not self.history:
@@ -2349,54 +3168,45 @@ class ImageSorterApp(QMainWindow):
             msg.exec()
             return
 
+        self.user_navigated = True
         self.defer_ui_updates = True  # Defer UI updates during undo
 
-        src_path, dest_path = self.history.pop()
-        save_history(self.history)
-
-        try:
-            if not os.path.exists(dest_path):
-                raise FileNotFoundError(f"Destination file {dest_path} not found.")
-
-            shutil.move(dest_path, src_path)
-            self.log_message(f"Undo: {dest_path} → {src_path}")
-
-            # Update caches
-            norm_src_path = os.path.normcase(os.path.normpath(src_path))
-            if norm_src_path in self.history_cache:
-                del self.history_cache[norm_src_path]
-            self.file_exists_cache[src_path] = True
-            self.file_exists_cache[dest_path] = False
-
-            # Update filtered_files
-            self.apply_filter()
-
-            # Find index of undone file in filtered_files
-            for i, path in enumerate(self.filtered_files):
-                if os.path.normcase(os.path.normpath(path)) == norm_src_path:
-                    self.current_index = i
-                    break
-            else:
-                self.current_index = min(self.current_index, len(self.filtered_files) - 1) if self.filtered_files else 0
-
-            # Clean nav_history
-            self.nav_history = [i for i in self.nav_history if i < len(self.filtered_files)]
-            filename = os.path.basename(src_path)
-
-            # Re-enable UI updates and refresh
+        src_path, dest_path = self.history.last()
+        if not self.stat_cache.exists(dest_path) and not self.move_queue.pending_source(dest_path):
             self.defer_ui_updates = False
-            self.show_current_image(self.filtered_files)
-            self.show_notification(f'"{filename}" has been restored to its original location.')
-        except Exception as e:
-            self.log_message(f"Undo Error: Failed to restore file: {str(e)}")
+            self.log_message(f"Undo Error: Failed to restore file: Destination file {dest_path} not found.")
             msg = QMessageBox()
             msg.setWindowTitle("Undo Error")
-            msg.setText(f"Failed to restore file: {str(e)}")
+            msg.setText(f"Failed to restore file: Destination file {dest_path} not found.")
             msg.setIcon(QMessageBox.Critical)
             self.apply_message_box_style(msg)
             msg.exec()
-            self.history.append((src_path, dest_path))
-            self.defer_ui_updates = False
+            return
+
+        # Antrian berurutan: undo selalu dijalankan setelah pemindahan yang dibatalkan
+        self.remove_history_entry(src_path)
+        self.stat_cache.invalidate(src_path, dest_path)
+        self.track_move_job(self.move_queue.submit(dest_path, src_path), src_path)
+
+        # Update filtered_files
+        self.apply_filter()
+        self.mark_path_state(src_path, AVAILABLE)
+
+        # Find index of undone file in filtered_files
+        index = self.position_of(src_path)
+        if index is not None:
+            self.current_index = index
+        else:
+            self.current_index = min(self.current_index, len(self.filtered_files) - 1) if self.filtered_files else 0
+
+        # Clean nav_history
+        self.nav_history = [i for i in self.nav_history if i < len(self.filtered_files)]
+        filename = os.path.basename(src_path)
+
+        # Re-enable UI updates and refresh
+        self.defer_ui_updates = False
+        self.show_current_image(self.filtered_files)
+        self.show_notification(f'"{filename}" has been restored to its original location.')
 
     def skip_image(self):
         self.nav_history.append(self.current_index)
@@ -2524,23 +3334,48 @@ class ImageSorterApp(QMainWindow):
             self.apply_message_box_style(msg)
             msg.exec()
 
+    def closeEvent(self, event):
+        self.folder_watcher.shutdown()
+        self.session_token.cancel()
+        if self.thread is not None:
+            self.thread.token.cancel()
+        for thread in self.watch_threads + self.retired_threads + [self.thread, self.metadata_thread]:
+            if thread is not None:
+                thread.wait()
+        self.prefetcher.shutdown()
+        self.stat_cache.shutdown()
+        if self.thumbnail_packs is not None:
+            self.thumbnail_packs.shutdown()
+        self.move_queue.stop()  # Tunggu semua pemindahan yang masih antre
+        self.history.close()
+        super().closeEvent(event)
+
     def apply_filter(self):
-        selected_ext = self.filter_combo.currentText()
-        if selected_ext == self.last_filter and self.filtered_files:
+        query_text = self.filter_combo.currentText().strip() or ALL_FILES
+        if query_text == self.last_filter and self.filtered_files:
             return  # No need to re-filter if the filter hasn't changed
 
-        self.last_filter = selected_ext
-        cache_key = selected_ext
+        try:
+            query = parse_query(query_text)
+        except ValueError as e:
+            self.show_notification(f"Invalid filter: {e}")
+            return
+        self.last_filter = query_text
+        self.current_query = query
+        cache_key = query_text
 
         # Check if filter result is cached
         if cache_key in self.filter_cache:
             self.filtered_files = self.filter_cache[cache_key]
         else:
-            self.filtered_files = [
-                path for path in self.image_files
-                if selected_ext == "All Files" or path.lower().endswith(selected_ext.lower())
-            ]
+            # Mask vektor di tabel metadata kolumnar (numpy jika tersedia)
+            table = self.image_files.table
+            self.filtered_files = PathList(table, self.metadata.filter_rows(self.image_files.rows, query, table))
             self.filter_cache[cache_key] = self.filtered_files[:]
+        if query.uses_metadata and self.metadata.loaded_count < len(self.metadata):
+            self.show_notification(
+                f"Reading image metadata ({self.metadata.loaded_count}/{len(self.metadata)}), results will update.")
+        self.rebuild_availability()
 
         print(f"[DEBUG] filtered_files: {len(self.filtered_files)} items")
 
@@ -2552,15 +3387,18 @@ class ImageSorterApp(QMainWindow):
                 self.current_index = valid_index
             else:
                 for i, path in enumerate(self.filtered_files):
-                    if path in self.file_exists_cache and self.file_exists_cache[path]:
+                    found, st = self.stat_cache.cached(path)  # Tanpa stat baru per file
+                    if found and st is not None:
                         self.current_index = i
                         break
 
-        self.position_stack.setCurrentIndex(0)
+        if not self.is_importing:
+            self.position_stack.setCurrentIndex(0)
         if not self.filtered_files:
             self.image_label.setText("No images match the filter.")
             self.next_image_label.setText("Next: None")
             self.file_info_label.setText("No image loaded.")
+            self.file_meta_label.setText("")
             self.position_info_label.setText("")
         else:
             self.show_current_image(self.filtered_files)
@@ -0,0 +1,96 @@
+# utils/availability.py
+
+from array import array
+
+AVAILABLE = 0
+MOVED = 1
+MISSING = 2
+
+class AvailabilityMap:
+    """
+    Status setiap gambar dalam daftar sesi: tersedia, sudah dipindahkan, atau hilang.
+    Status disimpan dalam bytearray, ditambah Fenwick tree berisi jumlah gambar yang
+    bisa dinavigasi (tersedia atau dipindahkan), sehingga pencarian indeks valid
+    berikutnya/sebelumnya cukup O(log n) tanpa os.path.exists per langkah.
+    """
+
+    def __init__(self, size=0, state=AVAILABLE):
+        self._states = bytearray([state]) * size
+        self._tree = array('i', [0]) * (size + 1)
+        if state != MISSING:
+            # Bangun Fenwick tree dalam O(n)
+            for i in range(1, size + 1):
+                self._tree[i] += 1
+                parent = i + (i & -i)
+                if parent <= size:
+                    self._tree[parent] += self._tree[i]
+
+    def __len__(self):
+        return len(self._states)
+
+    def _prefix(self, count):
+        """Jumlah gambar yang bisa dinavigasi pada indeks [0, count)."""
+        total = 0
+        i = count
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _add(self, index, delta):
+        i = index + 1
+        size = len(self._states)
+        while i <= size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _find_kth(self, k):
+        """Indeks (0-based) gambar ke-k yang bisa dinavigasi (k dimulai dari 1)."""
+        pos = 0
+        step = 1 << len(self._states).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= len(self._states) and self._tree[nxt] < k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+    def append(self, state=AVAILABLE):
+        """Tambah satu gambar di akhir daftar (dipakai saat import bertahap)."""
+        self._states.append(state)
+        size = len(self._states)
+        # Node baru mencakup rentang (size - lowbit, size]
+        value = self._prefix(size - 1) - self._prefix(size - (size & -size))
+        self._tree.append(value + (0 if state == MISSING else 1))
+
+    def extend(self, count, state=AVAILABLE):
+        for _ in range(count):
+            self.append(state)
+
+    def state(self, index):
+        return self._states[index]
+
+    def set_state(self, index, state):
+        old = self._states[index]
+        if old == state:
+            return
+        self._states[index] = state
+        was_navigable = old != MISSING
+        is_navigable = state != MISSING
+        if was_navigable != is_navigable:
+            self._add(index, 1 if is_navigable else -1)
+
+    def next_index(self, index):
+        """Indeks terkecil > `index` yang bisa dinavigasi, atau None."""
+        k = self._prefix(min(index + 1, len(self._states))) + 1 if index >= 0 else 1
+        if k > self._prefix(len(self._states)):
+            return None
+        return self._find_kth(k)
+
+    def previous_index(self, index):
+        """Indeks terbesar < `index` yang bisa dinavigasi, atau None."""
+        k = self._prefix(min(index, len(self._states)))
+        if k == 0:
+            return None
+        return self._find_kth(k)
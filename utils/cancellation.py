@@ -0,0 +1,20 @@
+# utils/cancellation.py
+
+import threading
+
+class CancellationToken:
+    """
+    Token pembatalan kooperatif yang dibagi oleh scanner, validator, dan prefetcher.
+    Pekerja mengecek `cancelled` di sela-sela unit kerja kecil (per file),
+    sehingga import lama berhenti dalam hitungan milidetik setelah cancel().
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
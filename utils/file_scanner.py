@@ -0,0 +1,152 @@
+# utils/file_scanner.py
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Ekstensi yang didukung, huruf kecil, dipakai untuk pencocokan case-insensitive
+SUPPORTED_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp',
+    '.tiff', '.heic', '.heif', '.raw', '.psd'
+})
+
+def is_supported_image(name: str) -> bool:
+    """
+    Cek apakah nama file memiliki ekstensi gambar yang didukung.
+    Pencocokan tidak peka huruf besar/kecil (IMG_0001.JPG juga cocok).
+    """
+    return os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS
+
+def scan_image_entries(folder_path: str, token=None):
+    """
+    Telusuri folder satu kali dengan os.scandir dan hasilkan DirEntry
+    untuk setiap file gambar yang didukung.
+    DirEntry menyimpan hasil stat sehingga dapat dipakai ulang tanpa stat tambahan.
+    Pemindaian berhenti begitu `token` (CancellationToken) dibatalkan.
+    """
+    try:
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if token is not None and token.cancelled:
+                    return
+                if not is_supported_image(entry.name):
+                    continue
+                try:
+                    if entry.is_file():
+                        yield entry
+                except OSError:
+                    continue
+    except OSError as e:
+        print(f"[DEBUG] Error scanning folder {folder_path}: {e}")
+
+def list_image_files(folder_path: str, token=None) -> list:
+    """Kembalikan daftar path lengkap semua file gambar di dalam folder."""
+    return [entry.path for entry in scan_image_entries(folder_path, token)]
+
+def _scan_folder(folder_path: str, token=None):
+    """Satu scandir: kembalikan (DirEntry gambar, path subfolder). Folder tersembunyi dilewati."""
+    images = []
+    subfolders = []
+    try:
+        with os.scandir(folder_path) as it:
+            for entry in it:
+                if token is not None and token.cancelled:
+                    break
+                try:
+                    if entry.is_dir():
+                        if not entry.name.startswith('.'):
+                            subfolders.append(entry.path)
+                    elif is_supported_image(entry.name) and entry.is_file():
+                        images.append(entry)
+                except OSError:
+                    continue
+    except OSError as e:
+        print(f"[DEBUG] Error scanning folder {folder_path}: {e}")
+    subfolders.sort()
+    return images, subfolders
+
+def walk_image_folders(root: str, token=None, max_workers: int = 4, dir_mtimes=None):
+    """
+    Telusuri `root` beserta subfoldernya secara rekursif (breadth-first) dan hasilkan
+    (folder, daftar DirEntry gambar, jumlah folder yang masih antre) per folder.
+    Beberapa folder di-scandir paralel oleh thread pool berukuran tetap, tetapi hasil
+    tetap dikirim berurutan sesuai antrean sehingga urutan sesi stabil.
+    Symlink ke folder diikuti; loop dideteksi lewat (device, inode) folder yang sudah dikunjungi.
+    Jika `dir_mtimes` diberikan, mtime setiap folder (diambil sebelum folder di-scandir) dicatat di situ.
+    """
+    try:
+        st = os.stat(root)
+    except OSError as e:
+        print(f"[DEBUG] Error scanning folder {root}: {e}")
+        return
+    visited = {(st.st_dev, st.st_ino)}
+    if dir_mtimes is not None:
+        dir_mtimes[root] = st.st_mtime_ns
+    queue = deque([root])
+    running = deque()  # (folder, Future) dalam urutan antrean
+    max_running = max(1, max_workers) * 2  # Batasi scandir yang berjalan/antre di pool
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="walker")
+    try:
+        while queue or running:
+            while queue and len(running) < max_running:
+                folder = queue.popleft()
+                running.append((folder, pool.submit(_scan_folder, folder, token)))
+            folder, future = running.popleft()
+            images, subfolders = future.result()
+            if token is not None and token.cancelled:
+                return
+            for subfolder in subfolders:
+                try:
+                    st = os.stat(subfolder)
+                except OSError:
+                    continue
+                key = (st.st_dev, st.st_ino)
+                if key in visited:
+                    print(f"[DEBUG] Skipping already visited folder (symlink loop?): {subfolder}")
+                    continue
+                visited.add(key)
+                if dir_mtimes is not None:
+                    dir_mtimes[subfolder] = st.st_mtime_ns
+                queue.append(subfolder)
+            yield folder, images, len(queue) + len(running)
+    finally:
+        # Batalkan scandir yang masih antre (cancel_futures baru ada di Python 3.9)
+        for _, future in running:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+def merge_import_sources(folders, files, recursive=False):
+    """
+    Gabungkan folder dan file hasil drop menjadi sumber import yang tidak saling tumpang tindih:
+    duplikat (termasuk lewat symlink) dibuang, folder yang sudah tercakup folder lain dibuang
+    saat import rekursif, dan file yang ikut terbaca dari folder yang di-drop tidak diulang.
+    Kembalikan (folders, files) dalam urutan drop.
+    """
+    def real(path):
+        return os.path.normcase(os.path.realpath(path))
+
+    folder_keys = {}
+    for folder in folders:
+        folder_keys.setdefault(real(folder), os.path.abspath(folder))
+    if recursive:
+        keys = sorted(folder_keys)  # Folder induk selalu muncul sebelum subfoldernya
+        kept = []
+        for key in keys:
+            if not any(key.startswith(os.path.join(parent, "")) for parent in kept):
+                kept.append(key)
+        folder_keys = {key: path for key, path in folder_keys.items() if key in kept}
+
+    def covered(folder_key):
+        if folder_key in folder_keys:
+            return True
+        return recursive and any(folder_key.startswith(os.path.join(key, "")) for key in folder_keys)
+
+    merged_files = []
+    seen = set()
+    for file in files:
+        key = real(file)
+        if key in seen or covered(os.path.dirname(key)):
+            continue
+        seen.add(key)
+        merged_files.append(os.path.abspath(file))
+    return list(folder_keys.values()), merged_files
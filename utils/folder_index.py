@@ -0,0 +1,172 @@
+# utils/folder_index.py
+
+import os
+import sqlite3
+import time
+
+class FolderIndex:
+    """
+    Indeks folder persisten berbasis SQLite.
+    Menyimpan hasil validasi per file (ukuran, mtime, format) agar folder yang
+    sama tidak perlu divalidasi ulang setelah aplikasi dibuka kembali.
+    File yang tidak valid disimpan dengan format kosong supaya juga tidak dicek ulang.
+    Metadata header (dimensi, tanggal, orientasi) disimpan di tabel terpisah sebagai
+    kunci pengurutan dan filter; pemanggil mencocokkan ukuran dan mtime sebelum memakainya.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    @staticmethod
+    def folder_key(folder_path):
+        return os.path.normcase(os.path.abspath(folder_path))
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS folders (
+                path TEXT PRIMARY KEY,
+                dir_mtime_ns INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                folder TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                format TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS files_folder_name ON files (folder, name)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS metadata (
+                folder TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                taken INTEGER NOT NULL,
+                orientation INTEGER NOT NULL,
+                PRIMARY KEY (folder, name)
+            )
+        """)
+        return conn
+
+    def load(self, folder_path):
+        """
+        Ambil data indeks sebuah folder.
+        Mengembalikan (dir_mtime_ns, rows) dengan rows berupa dict
+        name -> (size, mtime_ns, format), atau (None, {}) jika belum diindeks.
+        """
+        key = self.folder_key(folder_path)
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT dir_mtime_ns FROM folders WHERE path = ?", (key,)).fetchone()
+                if row is None:
+                    return None, {}
+                rows = {
+                    name: (size, mtime_ns, fmt)
+                    for name, size, mtime_ns, fmt in conn.execute(
+                        "SELECT name, size, mtime_ns, format FROM files WHERE folder = ? ORDER BY rowid", (key,))
+                }
+                return row[0], rows
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Error reading folder index: {e}")
+            return None, {}
+
+    def load_valid_names(self, folder_path):
+        """Nama file valid sebuah folder dalam urutan pemindaian (jalur cepat saat indeks masih berlaku)."""
+        key = self.folder_key(folder_path)
+        try:
+            conn = self._connect()
+            try:
+                return [name for (name,) in conn.execute(
+                    "SELECT name FROM files WHERE folder = ? AND format != '' ORDER BY rowid", (key,))]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Error reading folder index: {e}")
+            return []
+
+    def is_fresh(self, folder_path, dir_mtime_ns):
+        """Cek murah: indeks masih berlaku jika mtime direktori tidak berubah."""
+        key = self.folder_key(folder_path)
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT dir_mtime_ns FROM folders WHERE path = ?", (key,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Error reading folder index: {e}")
+            return False
+        return row is not None and row[0] == dir_mtime_ns
+
+    def save(self, folder_path, dir_mtime_ns, entries):
+        """
+        Ganti seluruh isi indeks folder dengan `entries`,
+        list of (name, size, mtime_ns, format) dalam urutan pemindaian.
+        """
+        key = self.folder_key(folder_path)
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("DELETE FROM files WHERE folder = ?", (key,))
+                    conn.executemany(
+                        "INSERT INTO files (folder, name, size, mtime_ns, format) VALUES (?, ?, ?, ?, ?)",
+                        ((key, name, size, mtime_ns, fmt) for name, size, mtime_ns, fmt in entries))
+                    # Metadata file yang sudah tidak ada di folder ikut dibuang
+                    conn.execute(
+                        "DELETE FROM metadata WHERE folder = ? AND name NOT IN (SELECT name FROM files WHERE folder = ?)",
+                        (key, key))
+                    conn.execute(
+                        "INSERT OR REPLACE INTO folders (path, dir_mtime_ns, indexed_at) VALUES (?, ?, ?)",
+                        (key, dir_mtime_ns, time.time()))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Error saving folder index: {e}")
+
+    def load_metadata(self, folder_path):
+        """Metadata tersimpan sebuah folder: dict name -> (size, mtime_ns, width, height, taken, orientation)."""
+        key = self.folder_key(folder_path)
+        try:
+            conn = self._connect()
+            try:
+                return {
+                    name: tuple(values)
+                    for name, *values in conn.execute(
+                        "SELECT name, size, mtime_ns, width, height, taken, orientation FROM metadata WHERE folder = ?",
+                        (key,))
+                }
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Error reading folder index: {e}")
+            return {}
+
+    def save_metadata(self, folder_path, rows):
+        """Simpan metadata, `rows` berupa list of (name, size, mtime_ns, width, height, taken, orientation)."""
+        key = self.folder_key(folder_path)
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO metadata "
+                        "(folder, name, size, mtime_ns, width, height, taken, orientation) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        ((key,) + tuple(row) for row in rows))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Error saving folder index: {e}")
@@ -0,0 +1,78 @@
+# utils/folder_listing_cache.py
+
+import os
+from collections import OrderedDict
+
+class FolderListingCache:
+    """
+    Cache LRU daftar gambar per folder yang sudah di-import dalam sesi aplikasi ini.
+    Total memori dibatasi `max_bytes` (perkiraan dari PathTable, daftar row, dan
+    tabel metadata yang ikut tertahan) dan jumlah entri dibatasi `max_entries`.
+    Setiap entri menyimpan mtime semua direktori yang dipindai saat import; sebelum
+    dipakai mtime dicek ulang sehingga folder yang berubah tidak memakai daftar lama.
+    """
+
+    def __init__(self, max_bytes, max_entries=16):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # folder -> (PathList, {direktori: mtime_ns}, perkiraan byte)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, folder):
+        """Salinan daftar gambar `folder` jika ada dan tidak ada direktori yang berubah, selain itu None."""
+        entry = self._entries.get(folder)
+        if entry is None:
+            self.misses += 1
+            return None
+        files, dir_mtimes, _ = entry
+        for path, mtime_ns in dir_mtimes.items():
+            try:
+                changed = os.stat(path).st_mtime_ns != mtime_ns
+            except OSError:
+                changed = True
+            if changed:
+                print(f"[DEBUG] Folder listing cache stale: {path} changed since import")
+                self.pop(folder)
+                self.stale += 1
+                return None
+        self._entries.move_to_end(folder)
+        self.hits += 1
+        return files.copy()
+
+    def put(self, folder, files, dir_mtimes, extra_bytes=0):
+        """
+        Simpan salinan `files` untuk `folder`. `dir_mtimes` berisi mtime direktori yang
+        dicatat sebelum dipindai; tanpa itu entri tidak bisa divalidasi dan tidak disimpan.
+        """
+        self.pop(folder)
+        if not dir_mtimes:
+            return
+        nbytes = files.nbytes() + files.table.nbytes() + extra_bytes
+        if nbytes > self.max_bytes:
+            print(f"[DEBUG] Folder listing too large to cache: {nbytes / 1e6:.1f} MB")
+            return
+        self._entries[folder] = (files.copy(), dict(dir_mtimes), nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            old_folder, (_, _, old_bytes) = self._entries.popitem(last=False)
+            self._bytes -= old_bytes
+            print(f"[DEBUG] Folder listing cache evicted {old_folder}")
+
+    def pop(self, folder):
+        entry = self._entries.pop(folder, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def summary(self):
+        return (f"{len(self._entries)} folders, {self._bytes / 1e6:.1f} MB, "
+                f"{self.hits} hits, {self.misses} misses, {self.stale} stale")
@@ -0,0 +1,137 @@
+# utils/folder_watcher.py
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+
+from utils.file_scanner import list_image_files
+
+class FolderWatcher(QObject):
+    """
+    Pantau folder sumber dan laporkan isinya setiap kali berubah.
+    Memakai QFileSystemWatcher (inotify di Linux) ditambah polling mtime direktori
+    sebagai cadangan untuk share jaringan yang tidak mengirim event.
+    Pemindaian ulang dijalankan di worker thread agar UI tidak tersendat; hasilnya
+    diterapkan di thread UI dan dibuang jika daftar folder sudah diganti (generasi lain).
+
+    Mode: "auto" (watcher + polling), "watcher", "poll", atau "off".
+    """
+    contents_changed = Signal(str, list)  # folder, daftar path gambar yang ada di disk
+    _scanned = Signal(int, str, object, list)  # generasi, folder, mtime_ns, path gambar (dari worker)
+
+    def __init__(self, parent=None, mode="auto", poll_interval_ms=5000, debounce_ms=500):
+        super().__init__(parent)
+        self.mode = mode
+        self.folders = {}  # folder -> mtime_ns direktori saat terakhir dipindai
+        self._dirty = set()
+        self._generation = 0  # Naik setiap kali daftar folder diganti
+        self._scanned.connect(self._on_scanned)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="watcher")
+        self._futures = set()  # Scan yang belum selesai, dibatalkan saat shutdown()
+
+        self._watcher = None
+        if mode in ("auto", "watcher"):
+            self._watcher = QFileSystemWatcher(self)
+            self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._scan_dirty)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_interval_ms)
+        self._poll_timer.timeout.connect(self._poll)
+
+    def watch(self, folders, dir_mtimes=None):
+        """
+        Ganti daftar folder yang dipantau. `dir_mtimes` berisi mtime folder yang dicatat
+        sebelum folder di-scan saat import; folder yang sudah berubah sejak itu langsung
+        dipindai ulang agar file yang ditambahkan selama import tidak terlewat.
+        """
+        self.stop()
+        if self.mode == "off":
+            return
+        dir_mtimes = dir_mtimes or {}
+        for folder in folders:
+            try:
+                mtime_ns = os.stat(folder).st_mtime_ns
+            except OSError:
+                continue
+            self.folders[folder] = dir_mtimes.get(folder, mtime_ns)
+            if self.folders[folder] != mtime_ns:
+                self._dirty.add(folder)
+        if self._watcher is not None and self.folders:
+            failed = self._watcher.addPaths(list(self.folders))
+            if failed:
+                print(f"[DEBUG] Watcher unavailable for {failed}, falling back to polling")
+        if self.mode in ("auto", "poll") or (self._watcher is None and self.folders):
+            self._poll_timer.start()
+        if self._dirty:
+            self._debounce.start()
+
+    def stop(self):
+        self._poll_timer.stop()
+        self._debounce.stop()
+        if self._watcher is not None:
+            watched = self._watcher.directories()
+            if watched:
+                self._watcher.removePaths(watched)
+        self.folders = {}
+        self._dirty = set()
+        self._generation += 1  # Hasil scan yang masih berjalan untuk daftar lama diabaikan
+
+    def shutdown(self):
+        self.stop()
+        # Batalkan scan yang masih antre (shutdown(cancel_futures=True) baru ada di Python 3.9)
+        for future in list(self._futures):
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def note_own_change(self, folder, mtime_before, mtime_after):
+        """
+        Catat perubahan `folder` oleh aplikasi sendiri (pemindahan atau undo). Jika mtime yang
+        tercatat masih mtime sebelum perubahan itu, mtime baru langsung dipakai sehingga folder
+        tidak dipindai ulang; jika ada perubahan luar di antaranya, folder tetap dipindai.
+        """
+        if mtime_after is not None and mtime_before is not None and self.folders.get(folder) == mtime_before:
+            self.folders[folder] = mtime_after
+
+    def _on_directory_changed(self, folder):
+        if folder in self.folders:
+            self._dirty.add(folder)
+            self._debounce.start()
+
+    def _poll(self):
+        for folder, mtime_ns in list(self.folders.items()):
+            try:
+                if os.stat(folder).st_mtime_ns != mtime_ns:
+                    self._dirty.add(folder)
+            except OSError:
+                continue
+        if self._dirty and not self._debounce.isActive():
+            self._debounce.start()
+
+    def _scan_dirty(self):
+        dirty, self._dirty = self._dirty, set()
+        for folder in dirty:
+            future = self._executor.submit(self._scan, folder, self._generation)
+            self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
+
+    def _scan(self, folder, generation):
+        # Berjalan di worker: hanya membaca, self.folders diubah di thread UI (_on_scanned)
+        try:
+            mtime_ns = os.stat(folder).st_mtime_ns
+        except OSError:
+            return
+        if generation != self._generation or self.folders.get(folder) == mtime_ns:
+            return  # Daftar folder sudah diganti, atau tidak ada perubahan sejak pemindaian terakhir
+        self._scanned.emit(generation, folder, mtime_ns, list_image_files(folder))
+
+    def _on_scanned(self, generation, folder, mtime_ns, paths):
+        if generation != self._generation or folder not in self.folders:
+            return  # Hasil scan untuk sesi sebelumnya
+        self.folders[folder] = mtime_ns
+        self.contents_changed.emit(folder, paths)
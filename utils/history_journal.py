@@ -0,0 +1,171 @@
+# utils/history_journal.py
+
+import json
+import os
+import threading
+
+class HistoryJournal:
+    """
+    History pemindahan yang disimpan sebagai JSON Lines append-only.
+    Setiap perubahan menambah satu baris, sehingga biaya per pemindahan tetap
+    walaupun history sudah sangat panjang. fsync dilakukan per batch, dan
+    journal dipadatkan (compaction) di thread latar belakang saat sudah terlalu panjang.
+
+    Jenis record:
+      {"op": "move", "src": ..., "dest": ...}  catat/ganti tujuan file
+      {"op": "remove", "src": ...}             hapus entri (undo atau rollback)
+      {"op": "clear"}                          kosongkan history
+    """
+
+    FSYNC_BATCH = 32
+    COMPACT_MIN_RECORDS = 1000
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self.record_count = 0
+        self._compacting = False
+        self._since_snapshot = []
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.normpath(path))
+
+    def replay(self):
+        """Baca ulang journal dan kembalikan list (src, dest) sesuai urutan pemindahan."""
+        entries = {}
+        count = 0
+        if not os.path.exists(self.path) and self.legacy_path and os.path.exists(self.legacy_path):
+            entries = self._load_legacy()
+            self._write_snapshot(self.path, list(entries.values()))
+            count = len(entries)
+        elif os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Baris terakhir bisa terpotong jika aplikasi berhenti mendadak
+                    count += 1
+                    op = record.get("op")
+                    if op == "move":
+                        key = self._key(record["src"])
+                        entries.pop(key, None)
+                        entries[key] = (record["src"], record["dest"])
+                    elif op == "remove":
+                        entries.pop(self._key(record["src"]), None)
+                    elif op == "clear":
+                        entries.clear()
+        self.record_count = count
+        return list(entries.values())
+
+    def _load_legacy(self):
+        """Migrasi dari history.json lama (list [src, dest] yang ditulis ulang setiap kali)."""
+        entries = {}
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                for src, dest in json.load(f):
+                    key = self._key(src)
+                    entries.pop(key, None)
+                    entries[key] = (src, dest)
+            print(f"[DEBUG] Migrated {len(entries)} entries from {self.legacy_path}")
+        except (json.JSONDecodeError, IOError, ValueError) as e:
+            print(f"[DEBUG] Error loading legacy history: {e}")
+        return entries
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            f = self._open()
+            f.write(line + "\n")
+            self.record_count += 1
+            self._unsynced += 1
+            if self._compacting:
+                self._since_snapshot.append(line)
+            if self._unsynced >= self.FSYNC_BATCH:
+                self._sync()
+
+    def append_move(self, src, dest):
+        self._append({"op": "move", "src": src, "dest": dest})
+
+    def append_remove(self, src):
+        self._append({"op": "remove", "src": src})
+
+    def clear(self):
+        self._append({"op": "clear"})
+
+    def _sync(self):
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def flush(self):
+        """Pastikan semua record sudah tersimpan ke disk (dipanggil berkala dan saat keluar)."""
+        try:
+            with self._lock:
+                self._sync()
+        except OSError as e:
+            print(f"[DEBUG] Error flushing history journal: {e}")
+
+    def needs_compaction(self, live_entries):
+        return not self._compacting and self.record_count > max(self.COMPACT_MIN_RECORDS, 2 * live_entries)
+
+    def compact_async(self, entries):
+        """Tulis ulang journal dari snapshot `entries` di thread latar belakang."""
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+            self._since_snapshot = []
+        threading.Thread(target=self._compact, args=(list(entries),), daemon=True).start()
+
+    def _write_snapshot(self, path, entries):
+        with open(path, "w", encoding="utf-8") as f:
+            for src, dest in entries:
+                f.write(json.dumps({"op": "move", "src": src, "dest": dest}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _compact(self, entries):
+        tmp_path = self.path + ".tmp"
+        try:
+            self._write_snapshot(tmp_path, entries)
+            with self._lock:
+                # Record yang ditulis selama snapshot dibuat disalin ke file baru
+                with open(tmp_path, "a", encoding="utf-8") as f:
+                    for line in self._since_snapshot:
+                        f.write(line + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                os.replace(tmp_path, self.path)
+                self.record_count = len(entries) + len(self._since_snapshot)
+                self._unsynced = 0
+            print(f"[DEBUG] History journal compacted to {self.record_count} records")
+        except OSError as e:
+            print(f"[DEBUG] Error compacting history journal: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+                self._since_snapshot = []
+
+    def close(self):
+        with self._lock:
+            try:
+                self._sync()
+            except OSError as e:
+                print(f"[DEBUG] Error flushing history journal: {e}")
+            if self._file is not None:
+                self._file.close()
+                self._file = None
@@ -0,0 +1,101 @@
+# utils/history_store.py
+
+import os
+from collections import OrderedDict
+
+def normalize_path(path):
+    return os.path.normcase(os.path.normpath(path))
+
+class HistoryStore:
+    """
+    History pemindahan dalam memori: dict berurutan dengan kunci path ternormalisasi.
+    Lookup, ganti tujuan, dan undo (entri terakhir) semuanya O(1).
+    Setiap perubahan diteruskan ke HistoryJournal jika tersedia.
+    """
+
+    def __init__(self, journal=None):
+        self.journal = journal
+        self._entries = OrderedDict()  # norm_src -> (src, dest)
+        self._folder_names = {}  # folder tujuan ternormalisasi -> nama folder
+        self._folder_prefixes = []  # (folder ternormalisasi, nama) untuk fallback subfolder
+
+    def load(self):
+        """Isi ulang store dari journal."""
+        self._entries.clear()
+        if self.journal is not None:
+            for src, dest in self.journal.replay():
+                self._entries[normalize_path(src)] = (src, dest)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries.values()))
+
+    def entries(self):
+        return list(self._entries.values())
+
+    def get(self, src_path):
+        """Tujuan terakhir file `src_path`, atau None jika belum pernah dipindahkan."""
+        entry = self._entries.get(normalize_path(src_path))
+        return entry[1] if entry is not None else None
+
+    def last(self):
+        """Entri (src, dest) terbaru, atau None jika history kosong."""
+        if not self._entries:
+            return None
+        return next(reversed(self._entries.values()))
+
+    def set(self, src_path, dest_path):
+        """Catat (atau ganti) tujuan file; entri dipindah ke posisi terbaru."""
+        key = normalize_path(src_path)
+        self._entries.pop(key, None)
+        self._entries[key] = (src_path, dest_path)
+        if self.journal is not None:
+            self.journal.append_move(src_path, dest_path)
+            self._compact_if_needed()
+
+    def remove(self, src_path):
+        self._entries.pop(normalize_path(src_path), None)
+        if self.journal is not None:
+            self.journal.append_remove(src_path)
+            self._compact_if_needed()
+
+    def clear(self):
+        self._entries.clear()
+        if self.journal is not None:
+            self.journal.clear()
+
+    def _compact_if_needed(self):
+        if self.journal.needs_compaction(len(self._entries)):
+            self.journal.compact_async(self.entries())
+
+    def set_folders(self, folder_names, folder_paths):
+        """Hitung ulang peta folder tujuan -> nama folder (dipanggil saat pengaturan folder berubah)."""
+        self._folder_names = {}
+        self._folder_prefixes = []
+        for name, path in zip(folder_names, folder_paths):
+            norm = normalize_path(path)
+            self._folder_names.setdefault(norm, name)
+            self._folder_prefixes.append((norm, name))
+
+    def folder_name(self, dest_path):
+        """Nama folder tujuan untuk `dest_path`; fallback ke nama direktori."""
+        dest_folder = os.path.dirname(dest_path)
+        norm_dest_folder = normalize_path(dest_folder)
+        name = self._folder_names.get(norm_dest_folder)
+        if name is not None:
+            return name
+        # Jarang terjadi: file berada di subfolder salah satu folder tujuan
+        for norm_folder, folder_name in self._folder_prefixes:
+            if norm_dest_folder.startswith(norm_folder):
+                self._folder_names[norm_dest_folder] = folder_name
+                return folder_name
+        return os.path.basename(os.path.normpath(dest_folder))
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
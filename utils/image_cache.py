@@ -0,0 +1,165 @@
+# utils/image_cache.py
+
+import os
+import threading
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QImage, QImageReader
+
+from utils.image_utils import MAIN_PREVIEW, NEXT_PREVIEW, preview_target_size, load_scaled_image, load_embedded_thumbnail
+from utils.thumbnail_cache import flavor_for
+
+class PreviewCache:
+    """
+    Cache LRU untuk preview yang sudah di-resize, dibatasi total byte.
+    Kunci berupa (path, mtime_ns, jenis preview) sehingga file yang berubah otomatis
+    tidak memakai preview lama, dan cache hit tidak perlu membuka file sama sekali.
+    Aman dipakai dari beberapa thread.
+    """
+
+    def __init__(self, max_bytes, thumbnail_cache=None, thumbnail_packs=None, stat_cache=None):
+        self.max_bytes = max_bytes
+        self.stat_cache = stat_cache  # StatCache bersama aplikasi, opsional
+        self.thumbnail_cache = thumbnail_cache  # ThumbnailCache di disk untuk preview berikutnya, opsional
+        self.thumbnail_packs = thumbnail_packs  # ThumbnailPackStore per folder, opsional
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.thumbnail_hits = 0  # Preview berikutnya yang diambil dari thumbnail EXIF
+        self.thumbnail_fallbacks = 0  # Preview berikutnya yang tetap perlu decode gambar
+
+    def get(self, key, record=True):
+        with self._lock:
+            image = self._items.get(key)
+            if image is None:
+                if record:
+                    self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            if record:
+                self.hits += 1
+            return image
+
+    def put(self, key, image: QImage):
+        size = image.sizeInBytes()
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old.sizeInBytes()
+            self._items[key] = image
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._items:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= evicted.sizeInBytes()
+                self.evictions += 1
+
+    def get_or_load(self, path, kind, record=True):
+        """
+        Ambil preview `kind` untuk `path` dari cache, atau decode dan simpan jika belum ada.
+        Mengembalikan QImage, atau None jika file tidak ada / tidak dapat dibaca.
+        `record=False` dipakai prefetch agar penghitung hit/miss hanya mencerminkan tampilan.
+        """
+        if self.stat_cache is not None:
+            st = self.stat_cache.stat(path)
+            if st is None:
+                return None
+        else:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+        # Target ukuran hanya bergantung pada isi file, jadi cukup dihitung saat cache miss
+        key = (path, st.st_mtime_ns, kind)
+        image = self.get(key, record)
+        if image is None:
+            reader = QImageReader(path) if kind == MAIN_PREVIEW else None
+            target_size = preview_target_size(path, kind, reader)
+            if target_size is None:
+                return None
+            if kind == NEXT_PREVIEW:
+                image = self._load_thumbnail(path, st, target_size)
+            if image is None:
+                image = load_scaled_image(path, target_size, smooth=kind == MAIN_PREVIEW, reader=reader)
+            if image.isNull():
+                return None
+            self.put(key, image)
+        return image
+
+    def _load_thumbnail(self, path, st, target_size):
+        """
+        Preview kecil tanpa decode gambar penuh jika memungkinkan: pack thumbnail folder,
+        cache thumbnail di disk, lalu thumbnail EXIF tertanam. Jika keduanya tidak ada, decode sekali ke ukuran
+        thumbnail standar dan simpan ke disk untuk pembukaan folder berikutnya.
+        """
+        if self.thumbnail_packs is not None and self.thumbnail_packs.thumb_size == target_size:
+            data = self.thumbnail_packs.load(path, st.st_mtime_ns)
+            if data is not None:
+                image = QImage.fromData(data, "JPG")
+                if not image.isNull():
+                    return image
+        if self.thumbnail_cache is not None:
+            image = self.thumbnail_cache.load(path, st.st_mtime, target_size)
+            if image is not None:
+                return self._fit(image, target_size)
+
+        # Jalur cepat: thumbnail tertanam di EXIF
+        image = load_embedded_thumbnail(path, target_size)
+        with self._lock:
+            if image is not None:
+                self.thumbnail_hits += 1
+            else:
+                self.thumbnail_fallbacks += 1
+        if image is not None or self.thumbnail_cache is None:
+            return image
+
+        _, flavor_size = flavor_for(target_size)
+        reader = QImageReader(path)
+        size = reader.size()
+        if size.isValid() and max(size.width(), size.height()) <= flavor_size:
+            thumb_size = (size.width(), size.height())  # Gambar kecil tidak diperbesar
+        else:
+            thumb_size = (flavor_size, flavor_size)
+        thumbnail = load_scaled_image(path, thumb_size, reader=reader)
+        if thumbnail.isNull():
+            return None
+        self.thumbnail_cache.save(path, st.st_mtime, st.st_size, thumbnail, target_size)
+        return self._fit(thumbnail, target_size)
+
+    @staticmethod
+    def _fit(image, target_size):
+        scaled_size = image.size().scaled(QSize(*target_size), Qt.AspectRatioMode.KeepAspectRatio)
+        if scaled_size == image.size():
+            return image
+        return image.scaled(scaled_size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "thumbnail_hits": self.thumbnail_hits,
+                "thumbnail_fallbacks": self.thumbnail_fallbacks,
+            }
+
+    def summary(self):
+        stats = self.stats()
+        return (f"{stats['entries']} entries, {stats['bytes'] / 1048576:.1f}/{stats['max_bytes'] / 1048576:.0f} MB, "
+                f"{stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions, "
+                f"{stats['thumbnail_hits']}/{stats['thumbnail_hits'] + stats['thumbnail_fallbacks']} next previews from EXIF thumbnails"
+                + (f", {self.thumbnail_cache.summary()}" if self.thumbnail_cache is not None else "")
+                + (f", {self.thumbnail_packs.summary()}" if self.thumbnail_packs is not None else ""))
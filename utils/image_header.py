@@ -0,0 +1,251 @@
+# utils/image_header.py
+
+import calendar
+import struct
+
+from utils.image_validator import sniff_format
+
+HEAD_SIZE = 16 * 1024  # Dibaca sekali di awal; cukup untuk header semua format kecuali JPEG dengan APP besar
+MAX_EXIF_SIZE = 64 * 1024  # Segmen APP1 JPEG dibatasi 64 KB oleh formatnya
+
+# Tag TIFF/EXIF yang dipakai
+TAG_IMAGE_WIDTH = 0x0100
+TAG_IMAGE_LENGTH = 0x0101
+TAG_ORIENTATION = 0x0112
+TAG_DATETIME = 0x0132
+TAG_EXIF_IFD = 0x8769
+TAG_DATETIME_ORIGINAL = 0x9003
+TAG_THUMBNAIL_OFFSET = 0x0201
+TAG_THUMBNAIL_LENGTH = 0x0202
+
+# Ukuran per item untuk tipe data TIFF (BYTE, ASCII, SHORT, LONG, RATIONAL, ...)
+TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8}
+
+# Marker SOF JPEG (baseline, progressive, lossless, ...), tanpa DHT/JPG/DAC
+SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+class ImageHeader:
+    """
+    Info yang dibaca dari header file tanpa decode piksel.
+      width, height : dimensi yang tersimpan (belum memperhitungkan orientasi), 0 jika tidak diketahui
+      orientation   : orientasi EXIF 1-8, 0 jika tidak ada
+      taken         : waktu pengambilan EXIF (detik, jam lokal kamera dianggap UTC), 0 jika tidak ada
+      thumbnail     : (offset, panjang) thumbnail JPEG tertanam di dalam file, atau None
+    """
+    __slots__ = ("format", "width", "height", "orientation", "taken", "thumbnail")
+
+    def __init__(self, fmt):
+        self.format = fmt
+        self.width = 0
+        self.height = 0
+        self.orientation = 0
+        self.taken = 0
+        self.thumbnail = None
+
+class _Source:
+    """Baca potongan file; bagian awal dilayani dari buffer, sisanya lewat seek."""
+
+    def __init__(self, f, head):
+        self.f = f
+        self.head = head
+
+    def read_at(self, offset, size):
+        if offset + size <= len(self.head):
+            return self.head[offset:offset + size]
+        self.f.seek(offset)
+        return self.f.read(size)
+
+def read_image_header(path):
+    """
+    Baca dimensi, orientasi, tanggal EXIF, dan lokasi thumbnail tertanam dari header
+    JPEG, PNG, GIF, BMP, WebP, atau TIFF. Hanya beberapa KB pertama yang dibaca
+    (JPEG: hanya header segmen sampai SOF). Kembalikan ImageHeader atau None jika
+    format tidak dikenali atau file tidak bisa dibaca.
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(HEAD_SIZE)
+            fmt = sniff_format(head)
+            parser = PARSERS.get(fmt)
+            if parser is None:
+                return None
+            header = ImageHeader(fmt)
+            parser(_Source(f, head), header)
+            return header
+    except (OSError, struct.error, ValueError, IndexError):
+        return None
+
+def _parse_png(source, header):
+    # IHDR selalu chunk pertama: panjang(4) 'IHDR'(4) width(4) height(4)
+    if source.head[12:16] == b'IHDR':
+        header.width, header.height = struct.unpack(">II", source.head[16:24])
+
+def _parse_gif(source, header):
+    header.width, header.height = struct.unpack("<HH", source.head[6:10])
+
+def _parse_bmp(source, header):
+    dib_size = struct.unpack("<I", source.head[14:18])[0]
+    if dib_size == 12:  # BITMAPCOREHEADER
+        header.width, header.height = struct.unpack("<HH", source.head[18:22])
+    else:
+        width, height = struct.unpack("<ii", source.head[18:26])
+        header.width, header.height = abs(width), abs(height)  # Tinggi negatif = top-down
+
+def _parse_webp(source, header):
+    head = source.head
+    offset = 12
+    # Chunk RIFF: fourcc(4) size(4) data (dipad ke genap)
+    while offset + 8 <= len(head):
+        fourcc = head[offset:offset + 4]
+        size = struct.unpack("<I", head[offset + 4:offset + 8])[0]
+        data = offset + 8
+        if fourcc == b'VP8X':
+            header.width = 1 + int.from_bytes(head[data + 4:data + 7], "little")
+            header.height = 1 + int.from_bytes(head[data + 7:data + 10], "little")
+        elif fourcc == b'VP8 ' and header.width == 0:
+            # Frame tag(3), start code 9d 01 2a, lalu lebar/tinggi 14 bit
+            if head[data + 3:data + 6] == b'\x9d\x01\x2a':
+                width, height = struct.unpack("<HH", head[data + 6:data + 10])
+                header.width, header.height = width & 0x3FFF, height & 0x3FFF
+        elif fourcc == b'VP8L' and header.width == 0:
+            if head[data] == 0x2F:
+                bits = int.from_bytes(head[data + 1:data + 5], "little")
+                header.width = (bits & 0x3FFF) + 1
+                header.height = ((bits >> 14) & 0x3FFF) + 1
+        elif fourcc == b'EXIF':
+            exif = source.read_at(data, min(size, MAX_EXIF_SIZE))
+            if exif.startswith(b'Exif\x00\x00'):
+                exif = exif[6:]
+            _parse_tiff_block(exif, header, data_offset=None)
+            break  # EXIF ada setelah data gambar; dimensi sudah dibaca
+        offset = data + size + (size & 1)
+
+def _parse_jpeg(source, header):
+    offset = 2
+    while True:
+        marker = source.read_at(offset, 4)
+        if len(marker) < 4 or marker[0] != 0xFF:
+            return
+        code = marker[1]
+        if code == 0xFF:  # Byte pengisi
+            offset += 1
+            continue
+        if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+            offset += 2  # Marker tanpa panjang
+            continue
+        length = struct.unpack(">H", marker[2:4])[0]
+        if code in SOF_MARKERS:
+            sof = source.read_at(offset + 4, 5)
+            header.height, header.width = struct.unpack(">HH", sof[1:5])
+            return
+        if code == 0xE1 and header.orientation == 0 and header.taken == 0:
+            segment = source.read_at(offset + 4, length - 2)
+            if segment.startswith(b'Exif\x00\x00'):
+                # Offset thumbnail relatif ke awal blok TIFF
+                _parse_tiff_block(segment[6:], header, data_offset=offset + 10)
+        if code in (0xD9, 0xDA):
+            return  # EOI/SOS sebelum SOF: file tidak biasa
+        offset += 2 + length
+
+def _parse_tiff(source, header):
+    # Untuk TIFF, IFD bisa berada di mana saja di file: baca blok dengan seek jika perlu
+    _parse_tiff_block(source, header, data_offset=0)
+    header.thumbnail = None  # Thumbnail JPEG tertanam hanya dipakai untuk JPEG
+
+def _parse_tiff_block(block, header, data_offset):
+    """
+    Parse struktur TIFF (blok EXIF JPEG/WebP, atau file TIFF lewat _Source).
+    `data_offset` adalah posisi blok di dalam file untuk menghitung lokasi thumbnail.
+    """
+    read = block.read_at if isinstance(block, _Source) else lambda off, size: block[off:off + size]
+    order = read(0, 2)
+    if order == b'II':
+        endian = "<"
+    elif order == b'MM':
+        endian = ">"
+    else:
+        return
+    if struct.unpack(endian + "H", read(2, 2))[0] != 42:
+        return
+    ifd0 = struct.unpack(endian + "I", read(4, 4))[0]
+    tags, next_ifd = _read_ifd(read, endian, ifd0)
+
+    header.orientation = _tag_int(tags.get(TAG_ORIENTATION), 0)
+    if not 1 <= header.orientation <= 8:
+        header.orientation = 0
+    if TAG_IMAGE_WIDTH in tags and TAG_IMAGE_LENGTH in tags:
+        header.width = _tag_int(tags[TAG_IMAGE_WIDTH], 0)
+        header.height = _tag_int(tags[TAG_IMAGE_LENGTH], 0)
+    taken = tags.get(TAG_DATETIME)
+    if TAG_EXIF_IFD in tags:
+        exif_tags, _ = _read_ifd(read, endian, _tag_int(tags[TAG_EXIF_IFD], 0))
+        taken = exif_tags.get(TAG_DATETIME_ORIGINAL, taken)
+    header.taken = _parse_exif_datetime(taken)
+
+    if next_ifd and data_offset is not None:
+        ifd1, _ = _read_ifd(read, endian, next_ifd)
+        thumb_offset = _tag_int(ifd1.get(TAG_THUMBNAIL_OFFSET), 0)
+        thumb_length = _tag_int(ifd1.get(TAG_THUMBNAIL_LENGTH), 0)
+        if thumb_offset and thumb_length:
+            header.thumbnail = (data_offset + thumb_offset, thumb_length)
+
+def _read_ifd(read, endian, offset):
+    """Baca satu IFD: kembalikan ({tag: nilai}, offset IFD berikutnya). Nilai berupa tuple int atau bytes."""
+    tags = {}
+    if not offset:
+        return tags, 0
+    count_bytes = read(offset, 2)
+    if len(count_bytes) < 2:
+        return tags, 0
+    count = struct.unpack(endian + "H", count_bytes)[0]
+    entries = read(offset + 2, count * 12 + 4)
+    if len(entries) < count * 12 + 4:
+        return tags, 0
+    for i in range(count):
+        tag, kind, n = struct.unpack(endian + "HHI", entries[i * 12:i * 12 + 8])
+        item_size = TIFF_TYPE_SIZES.get(kind)
+        if item_size is None or n == 0:
+            continue
+        raw = entries[i * 12 + 8:i * 12 + 12]
+        size = item_size * n
+        if size > 4:
+            if kind != 2:
+                continue  # Hanya string yang perlu dibaca dari luar entri
+            raw = read(struct.unpack(endian + "I", raw)[0], size)
+        if kind == 2:
+            tags[tag] = raw[:size]
+        elif kind == 3:
+            tags[tag] = struct.unpack(endian + "H" * n, raw[:size])
+        elif kind == 4:
+            tags[tag] = struct.unpack(endian + "I" * n, raw[:size])
+    next_ifd = struct.unpack(endian + "I", entries[count * 12:count * 12 + 4])[0]
+    return tags, next_ifd
+
+def _tag_int(value, default):
+    if isinstance(value, tuple) and value:
+        return value[0]
+    return default
+
+def _parse_exif_datetime(value):
+    """'YYYY:MM:DD HH:MM:SS' -> detik (jam lokal kamera diperlakukan sebagai UTC), 0 jika tidak valid."""
+    if not isinstance(value, bytes) or len(value) < 19:
+        return 0
+    try:
+        text = value[:19].decode("ascii")
+        date, clock = text.split(" ")
+        year, month, day = (int(part) for part in date.split(":"))
+        hour, minute, second = (int(part) for part in clock.split(":"))
+        if year == 0:
+            return 0
+        return calendar.timegm((year, month, day, hour, minute, second))
+    except (ValueError, UnicodeDecodeError):
+        return 0
+
+PARSERS = {
+    'jpeg': _parse_jpeg,
+    'png': _parse_png,
+    'gif': _parse_gif,
+    'bmp': _parse_bmp,
+    'webp': _parse_webp,
+    'tiff': _parse_tiff,
+}
@@ -1,51 +1,85 @@
 # utils/image_utils.py
 
-from PySide6.QtGui import QPixmap, QImage
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QImageReader
+from PySide6.QtCore import Qt, QSize
 
-def resize_image(pixmap: QPixmap) -> QPixmap:
-    """
-    Resize pixmap untuk area preview utama berdasarkan rasio aspek:
-    - Persegi     → 500x500
-    - Landscape   → 720x450
-    - Portrait    → 450x500
-    """
-    if pixmap.isNull():
-        return pixmap
+from utils.image_header import read_image_header
 
-    # Konversi ke QImage untuk pengubahan ukuran yang lebih cepat
-    image = pixmap.toImage()
-    width, height = image.width(), image.height()
+MAIN_PREVIEW = "main"
+NEXT_PREVIEW = "next"
+NEXT_PREVIEW_SIZE = (200, 260)
+MIN_THUMBNAIL_SCALE = 0.75  # Thumbnail tertanam boleh diperbesar paling banyak ~1.33x
+MAX_THUMBNAIL_ASPECT_ERROR = 0.05  # Tolak thumbnail dengan rasio berbeda (biasanya ada bar hitam)
 
-    # Tetapkan target ukuran berdasarkan orientasi gambar
+def main_target_size(width: int, height: int) -> tuple:
+    """Target ukuran preview utama berdasarkan orientasi gambar."""
     if width == height:
-        target_width, target_height = 500, 500
+        return 500, 500
     elif width > height:
-        target_width, target_height = 720, 450  # Landscape
+        return 720, 450  # Landscape
     else:
-        target_width, target_height = 450, 500  # Portrait
+        return 450, 500  # Portrait
+
+def preview_target_size(path: str, kind: str, reader: QImageReader = None):
+    """
+    Tentukan target ukuran preview tanpa decode piksel.
+    Untuk preview utama, ukuran gambar dibaca dari header file.
+    """
+    if kind == NEXT_PREVIEW:
+        return NEXT_PREVIEW_SIZE
+    size = (reader or QImageReader(path)).size()
+    if not size.isValid():
+        return None
+    return main_target_size(size.width(), size.height())
+
+def load_scaled_image(path: str, target_size: tuple, smooth: bool = True, reader: QImageReader = None) -> QImage:
+    """
+    Decode gambar langsung ke ukuran yang muat di dalam `target_size` (rasio aspek dipertahankan).
+    Ukuran asli dibaca dari header lalu diminta ke decoder lewat setScaledSize,
+    sehingga decoder JPEG dapat memakai DCT scaling tanpa membuat buffer resolusi penuh.
+    """
+    reader = reader or QImageReader(path)
+    size = reader.size()
+    if not size.isValid():
+        # Format tanpa info ukuran di header: decode penuh lalu resize
+        image = reader.read()
+        if image.isNull():
+            return image
+        return image.scaled(
+            target_size[0],
+            target_size[1],
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation if smooth else Qt.TransformationMode.FastTransformation
+        )
 
-    resized_image = image.scaled(
-        target_width,
-        target_height,
-        Qt.AspectRatioMode.KeepAspectRatio,
-        Qt.TransformationMode.SmoothTransformation
-    )
-    return QPixmap.fromImage(resized_image)
+    scaled_size = size.scaled(QSize(target_size[0], target_size[1]), Qt.AspectRatioMode.KeepAspectRatio)
+    # Kualitas rendah memilih jalur scaling cepat pada decoder JPEG
+    reader.setQuality(100 if smooth else 25)
+    reader.setScaledSize(scaled_size)
+    return reader.read()
 
-def resize_next_preview(pixmap: QPixmap, max_width: int = 200, max_height: int = 260) -> QPixmap:
+def load_embedded_thumbnail(path: str, target_size: tuple):
     """
-    Resize pixmap untuk preview berikutnya (thumbnail kecil).
-    Parameter `max_width` dan `max_height` dapat disesuaikan secara opsional.
+    Ambil thumbnail JPEG yang tertanam di EXIF (APP1) lalu resize ke `target_size`,
+    tanpa decode gambar penuh. Kembalikan None jika tidak ada thumbnail, rasio aspeknya
+    tidak sama dengan gambar asli, atau terlalu kecil untuk target.
     """
-    if pixmap.isNull():
-        return pixmap
-
-    image = pixmap.toImage()
-    resized_image = image.scaled(
-        max_width,
-        max_height,
-        Qt.AspectRatioMode.KeepAspectRatio,
-        Qt.TransformationMode.FastTransformation
-    )
-    return QPixmap.fromImage(resized_image)
\ No newline at end of file
+    header = read_image_header(path)
+    if header is None or header.thumbnail is None or not header.width or not header.height:
+        return None
+    offset, length = header.thumbnail
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+    except OSError:
+        return None
+    image = QImage.fromData(data, "JPG")
+    if image.isNull():
+        return None
+    if abs(image.width() / image.height() - header.width / header.height) > MAX_THUMBNAIL_ASPECT_ERROR * header.width / header.height:
+        return None
+    scaled_size = QSize(header.width, header.height).scaled(QSize(*target_size), Qt.AspectRatioMode.KeepAspectRatio)
+    if image.width() < scaled_size.width() * MIN_THUMBNAIL_SCALE or image.height() < scaled_size.height() * MIN_THUMBNAIL_SCALE:
+        return None
+    return image.scaled(scaled_size, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
@@ -0,0 +1,135 @@
+# utils/image_validator.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtGui import QImageReader
+
+HEADER_SIZE = 32  # Cukup untuk semua magic bytes di bawah
+
+HEIF_BRANDS = (b'heic', b'heix', b'hevc', b'hevx', b'heim', b'heis', b'mif1', b'msf1', b'avif')
+
+def sniff_format(header: bytes):
+    """
+    Tebak format gambar dari magic bytes di awal file.
+    Mengembalikan nama format Qt ('png', 'jpeg', ...) atau None jika tidak dikenali.
+    """
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if header.startswith(b'BM') and len(header) >= 14:
+        return 'bmp'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp'
+    if header[:4] in (b'II*\x00', b'MM\x00*'):
+        return 'tiff'
+    if header[:4] == b'8BPS':
+        return 'psd'
+    if header[4:8] == b'ftyp' and header[8:12] in HEIF_BRANDS:
+        return 'heif'
+    return None
+
+class ValidationStats:
+    """Penghitung throughput per format (jumlah file, file valid, waktu total)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.formats = {}
+
+    def record(self, fmt, seconds, valid):
+        with self._lock:
+            files, valid_files, total = self.formats.get(fmt, (0, 0, 0.0))
+            self.formats[fmt] = (files + 1, valid_files + int(valid), total + seconds)
+
+    def summary(self):
+        """Ringkasan per format, diurutkan dari yang paling banyak memakan waktu."""
+        lines = []
+        with self._lock:
+            items = sorted(self.formats.items(), key=lambda item: item[1][2], reverse=True)
+        for fmt, (files, valid_files, total) in items:
+            rate = files / total if total > 0 else 0.0
+            lines.append(f"{fmt}: {files} files, {valid_files} valid, {total * 1000:.1f} ms, {rate:.0f} files/s")
+        return lines
+
+class ImageValidator:
+    """
+    Validasi gambar secara paralel. Header file dibaca dulu untuk dicocokkan
+    dengan magic bytes; QImageReader hanya dipakai untuk format yang ambigu.
+    """
+
+    def __init__(self, max_workers=0):
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self.stats = ValidationStats()
+        self._pool = None  # Dibuat saat validate_batches pertama, dipakai ulang sampai close()
+        formats = {bytes(fmt).decode('ascii', 'ignore').lower() for fmt in QImageReader.supportedImageFormats()}
+        if 'jpg' in formats:
+            formats.add('jpeg')
+        if 'heic' in formats:
+            formats.add('heif')
+        self.qt_formats = formats
+
+    def validate(self, path):
+        """Kembalikan nama format jika file dapat dibaca sebagai gambar, selain itu None."""
+        start = time.perf_counter()
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(HEADER_SIZE)
+        except OSError:
+            self.stats.record('unreadable', time.perf_counter() - start, False)
+            return None
+
+        fmt = sniff_format(header)
+        if fmt is not None and fmt in self.qt_formats:
+            self.stats.record(fmt, time.perf_counter() - start, True)
+            return fmt
+
+        # Format ambigu atau tanpa plugin bawaan: serahkan ke QImageReader
+        detected = None
+        try:
+            reader = QImageReader(path)
+            if reader.canRead():
+                detected = bytes(reader.format()).decode('ascii', 'ignore').lower() or fmt or 'unknown'
+        except Exception:
+            pass
+        self.stats.record(f"{fmt or 'unknown'} (reader)", time.perf_counter() - start, detected is not None)
+        return detected
+
+    def validate_batches(self, paths, first_batch_size=8, batch_size=256, token=None):
+        """
+        Validasi `paths` di worker pool dan hasilkan (jumlah_diproses, hasil) per batch,
+        dengan hasil berupa list of (path, format) dan format None untuk file tidak valid.
+        Urutan hasil sama seperti input. Jika `token` dibatalkan, file yang belum
+        dikerjakan dilewati dan generator berhenti tanpa menunggu batch selesai.
+        Worker pool dipakai ulang antar-panggilan (misalnya per folder saat import
+        beberapa sumber); panggil close() setelah selesai.
+        """
+        def validate(path):
+            if token is not None and token.cancelled:
+                return None
+            return self.validate(path)
+
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        pool = self._pool
+        start = 0
+        size = max(first_batch_size, self.max_workers)
+        while start < len(paths):
+            batch = paths[start:start + size]
+            results = list(zip(batch, pool.map(validate, batch)))
+            if token is not None and token.cancelled:
+                return
+            start += len(batch)
+            size = batch_size
+            yield len(batch), results
+
+    def close(self):
+        if self._pool is not None:
+            # Tidak ada future yang tertunda: setiap batch pool.map selesai sebelum di-yield,
+            # jadi cancel_futures (Python 3.9+) tidak diperlukan
+            self._pool.shutdown(wait=False)
+            self._pool = None
@@ -0,0 +1,249 @@
+# utils/metadata_table.py
+
+import calendar
+import operator
+import os
+import time
+from array import array
+
+from PySide6.QtGui import QImageReader
+
+from utils.image_header import read_image_header
+
+try:
+    import numpy as np
+except ImportError:  # numpy opsional; tanpa numpy filter dievaluasi per baris
+    np = None
+
+UNKNOWN_SIZE = -1
+
+# QImageIOHandler.Transformation -> nilai orientasi EXIF (1-8)
+QT_TO_EXIF_ORIENTATION = {0: 1, 1: 2, 3: 3, 2: 4, 5: 5, 4: 6, 6: 7, 7: 8}
+
+OPS = {
+    "=": operator.eq, "!=": operator.ne,
+    ">": operator.gt, ">=": operator.ge,
+    "<": operator.lt, "<=": operator.le,
+}
+
+def read_metadata(path):
+    """
+    Baca metadata dasar tanpa decode piksel: ukuran file, lalu dimensi, orientasi, dan
+    tanggal pengambilan EXIF dari header (image_header). Format lain memakai QImageReader;
+    tanpa tanggal EXIF dipakai mtime.
+    Kembalikan (size, width, height, taken, orientation, mtime_ns) atau None jika gagal.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    header = read_image_header(path)
+    if header is not None and header.width > 0 and header.height > 0:
+        width, height, orientation, taken = header.width, header.height, header.orientation, header.taken
+    else:
+        reader = QImageReader(path)
+        size = reader.size()
+        width, height = max(size.width(), 0), max(size.height(), 0)
+        orientation = QT_TO_EXIF_ORIENTATION.get(reader.transformation().value, 0)
+        taken = header.taken if header is not None else 0
+    if not taken:
+        # Samakan dengan tanggal EXIF: jam lokal disimpan sebagai detik "UTC"
+        taken = calendar.timegm(time.localtime(st.st_mtime))
+    return st.st_size, width, height, taken, orientation, st.st_mtime_ns
+
+def format_file_size(size: int) -> str:
+    """Ukuran file dalam satuan yang mudah dibaca (B, KB, MB, GB)."""
+    if size < 0:
+        return "?"
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+class MetadataTable:
+    """
+    Metadata per gambar dalam bentuk kolom (array module), sejajar dengan row PathTable.
+    Kolom numerik bisa dibungkus numpy tanpa salinan (np.frombuffer) sehingga filter
+    dievaluasi sebagai mask vektor; tanpa numpy dipakai loop per baris.
+    """
+
+    def __init__(self):
+        self.ext = array('B')  # id ekstensi, lihat ext_ids
+        self.size = array('q')
+        self.width = array('i')
+        self.height = array('i')
+        self.taken = array('q')  # jam lokal sebagai detik epoch UTC, 0 = belum diketahui
+        self.orientation = array('b')  # EXIF 1-8, 0 = belum diketahui
+        self.mtime = array('q')  # mtime_ns file
+        self.loaded = array('B')
+        self.ext_ids = {}
+        self.loaded_count = 0
+
+    def __len__(self):
+        return len(self.ext)
+
+    def nbytes(self):
+        """Perkiraan memori kolom dalam byte."""
+        return sum(column.itemsize * len(column) for column in (
+            self.ext, self.size, self.width, self.height, self.taken, self.orientation, self.mtime, self.loaded))
+
+    def ext_id(self, ext):
+        ext_id = self.ext_ids.get(ext)
+        if ext_id is None:
+            ext_id = len(self.ext_ids) + 1
+            if ext_id > 255:
+                return 0  # Sangat jarang: terlalu banyak ekstensi berbeda
+            self.ext_ids[ext] = ext_id
+        return ext_id
+
+    def ensure_rows(self, rows, paths):
+        """Tambahkan kolom kosong untuk row baru; ekstensi langsung diisi dari path."""
+        for row, path in zip(rows, paths):
+            if row < len(self.ext):
+                continue
+            missing = row - len(self.ext)
+            if missing:
+                self._grow(missing, 0)
+            self._grow(1, self.ext_id(os.path.splitext(path)[1].lower()))
+
+    def _grow(self, count, ext_id):
+        self.ext.extend([ext_id] * count)
+        self.size.extend([UNKNOWN_SIZE] * count)
+        self.width.extend([0] * count)
+        self.height.extend([0] * count)
+        self.taken.extend([0] * count)
+        self.orientation.extend([0] * count)
+        self.mtime.extend([0] * count)
+        self.loaded.extend([0] * count)
+
+    def set_row(self, row, size, width, height, taken, orientation, mtime_ns):
+        if row >= len(self.ext):
+            return
+        self.size[row] = size
+        self.width[row] = width
+        self.height[row] = height
+        self.taken[row] = taken
+        self.orientation[row] = orientation
+        self.mtime[row] = mtime_ns
+        if not self.loaded[row]:
+            self.loaded[row] = 1
+            self.loaded_count += 1
+
+    def unload_rows(self, rows):
+        """Tandai metadata `rows` belum dimuat, misalnya karena file di path yang sama sudah diganti."""
+        for row in rows:
+            if row < len(self.loaded) and self.loaded[row]:
+                self.loaded[row] = 0
+                self.loaded_count -= 1
+
+    def unloaded_rows(self, rows):
+        return [row for row in rows if row < len(self.loaded) and not self.loaded[row]]
+
+    def filter_rows(self, rows, query, path_table):
+        """Kembalikan array('I') berisi row dari `rows` yang cocok dengan `query`, urutan tetap."""
+        if query.is_empty:
+            return array('I', rows)
+        if query.name_patterns:
+            # Pola nama dicocokkan sekali ke seluruh buffer nama, lalu disaring per row
+            matched = None
+            for pattern in query.name_patterns:
+                rows_for_pattern = path_table.rows_matching_name(pattern)
+                matched = rows_for_pattern if matched is None else matched & rows_for_pattern
+            rows = array('I', [row for row in rows if row in matched])
+        if np is not None:
+            return self._filter_numpy(rows, query)
+        return array('I', self._filter_python(rows, query))
+
+    def _ext_ids_for(self, query):
+        return {self.ext_ids[ext] for ext in query.exts if ext in self.ext_ids}
+
+    def _filter_numpy(self, rows, query):
+        r = np.frombuffer(rows, dtype=np.uint32) if len(rows) else np.zeros(0, dtype=np.uint32)
+        mask = np.ones(len(r), dtype=bool)
+        if query.exts is not None:
+            mask &= np.isin(self._column(self.ext, np.uint8)[r], list(self._ext_ids_for(query)))
+        needs_dims = query.orientation is not None or any(
+            field in ("width", "height", "pixels") for field, _, _ in query.conditions)
+        if needs_dims:
+            width = self._column(self.width, np.int32)[r].astype(np.int64)
+            height = self._column(self.height, np.int32)[r].astype(np.int64)
+            mask &= (width > 0) & (height > 0)
+        for field, op, value in query.conditions:
+            if field == "pixels":
+                column = width * height
+            elif field == "width":
+                column = width
+            elif field == "height":
+                column = height
+            elif field == "size":
+                column = self._column(self.size, np.int64)[r]
+                mask &= column >= 0
+            else:
+                column = self._column(self.taken, np.int64)[r]
+                mask &= column > 0
+            mask &= OPS[op](column, value)
+        if query.orientation is not None:
+            orientation = self._column(self.orientation, np.int8)[r]
+            if isinstance(query.orientation, int):
+                mask &= orientation == query.orientation
+            else:
+                # Orientasi EXIF 5-8 memutar gambar 90 derajat: tukar lebar dan tinggi
+                rotated = orientation >= 5
+                shown_w = np.where(rotated, height, width)
+                shown_h = np.where(rotated, width, height)
+                mask &= self._orientation_mask(query.orientation, shown_w, shown_h)
+        selected = array('I')
+        selected.frombytes(r[mask].astype(np.uint32).tobytes())
+        return selected
+
+    @staticmethod
+    def _orientation_mask(name, shown_w, shown_h):
+        if name == "portrait":
+            return shown_h > shown_w
+        if name == "landscape":
+            return shown_w > shown_h
+        return shown_w == shown_h
+
+    @staticmethod
+    def _column(column, dtype):
+        if not len(column):
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(column, dtype=dtype)
+
+    def _filter_python(self, rows, query):
+        ext_ids = self._ext_ids_for(query) if query.exts is not None else None
+        conditions = [(field, OPS[op], value) for field, op, value in query.conditions]
+        selected = []
+        for row in rows:
+            if ext_ids is not None and self.ext[row] not in ext_ids:
+                continue
+            width, height = self.width[row], self.height[row]
+            ok = True
+            for field, op, value in conditions:
+                if field == "size":
+                    column = self.size[row]
+                    ok = column >= 0 and op(column, value)
+                elif field == "taken":
+                    column = self.taken[row]
+                    ok = column > 0 and op(column, value)
+                else:
+                    column = width if field == "width" else height if field == "height" else width * height
+                    ok = width > 0 and height > 0 and op(column, value)
+                if not ok:
+                    break
+            if not ok:
+                continue
+            if query.orientation is not None:
+                orientation = self.orientation[row]
+                if isinstance(query.orientation, int):
+                    if orientation != query.orientation:
+                        continue
+                else:
+                    if width <= 0 or height <= 0:
+                        continue
+                    shown_w, shown_h = (height, width) if orientation >= 5 else (width, height)
+                    if not self._orientation_mask(query.orientation, shown_w, shown_h):
+                        continue
+            selected.append(row)
+        return selected
@@ -0,0 +1,112 @@
+# utils/move_queue.py
+
+import errno
+import os
+import queue
+import shutil
+import threading
+import time
+
+from PySide6.QtCore import QThread, Signal
+
+# Error yang biasanya sementara (NAS sibuk, file sedang dikunci aplikasi lain)
+TRANSIENT_ERRNOS = {errno.EAGAIN, errno.EBUSY, errno.ETIMEDOUT, errno.EIO, errno.EINTR}
+TRANSIENT_WINERRORS = {32, 33}  # ERROR_SHARING_VIOLATION, ERROR_LOCK_VIOLATION
+
+def _dir_mtime(folder):
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+def is_transient_error(error: OSError) -> bool:
+    if isinstance(error, FileNotFoundError):
+        return False
+    if getattr(error, "winerror", None) in TRANSIENT_WINERRORS:
+        return True
+    return error.errno in TRANSIENT_ERRNOS
+
+class MoveQueue(QThread):
+    """
+    Antrian pemindahan file di thread latar belakang.
+    Job dijalankan berurutan sesuai urutan masuk, sehingga undo yang diantrekan
+    setelah pemindahan selalu dijalankan setelah pemindahan tersebut selesai.
+    File yang sudah ada di tujuan tidak pernah ditimpa; job seperti itu dianggap gagal.
+    Job yang berhasil melaporkan mtime folder asal dan tujuan sebelum dan sesudah pemindahan,
+    agar watcher folder bisa membedakan perubahan oleh aplikasi sendiri dari perubahan luar.
+    """
+    job_finished = Signal(int, str, str, list)  # job_id, source, dest, [(folder, mtime sebelum, mtime sesudah)]
+    job_failed = Signal(int, str, str, str)  # job_id, source, dest, pesan error
+
+    MAX_RETRIES = 3
+    RETRY_DELAY = 0.2  # detik, dilipatgandakan setiap percobaan ulang
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = {}  # dest -> source untuk job yang belum selesai
+        self._next_id = 1
+
+    def submit(self, source, dest) -> int:
+        """Masukkan job pemindahan ke antrian dan kembalikan ID job."""
+        with self._lock:
+            job_id = self._next_id
+            self._next_id += 1
+            self._pending[os.path.normcase(os.path.normpath(dest))] = source
+        self._queue.put((job_id, source, dest))
+        return job_id
+
+    def pending_source(self, dest):
+        """Lokasi file saat ini jika `dest` adalah tujuan job yang belum selesai, selain itu None."""
+        with self._lock:
+            return self._pending.get(os.path.normcase(os.path.normpath(dest)))
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            job_id, source, dest = job
+            folders = list(dict.fromkeys((os.path.dirname(source), os.path.dirname(dest))))
+            before = [_dir_mtime(folder) for folder in folders]
+            error = self._move_with_retry(source, dest)
+            with self._lock:
+                key = os.path.normcase(os.path.normpath(dest))
+                if self._pending.get(key) == source:
+                    del self._pending[key]
+            if error is None:
+                dir_mtimes = [(folder, mtime_ns, _dir_mtime(folder)) for folder, mtime_ns in zip(folders, before)]
+                self.job_finished.emit(job_id, source, dest, dir_mtimes)
+            else:
+                self.job_failed.emit(job_id, source, dest, error)
+
+    def _move_with_retry(self, source, dest):
+        delay = self.RETRY_DELAY
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                if not os.path.exists(source):
+                    raise FileNotFoundError(f"File {source} not found.")
+                if os.path.lexists(dest):
+                    raise FileExistsError(errno.EEXIST, "Destination file already exists", dest)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                shutil.move(source, dest)
+                return None
+            except OSError as e:
+                if attempt < self.MAX_RETRIES and is_transient_error(e):
+                    print(f"[DEBUG] Move retry {attempt + 1} for {source}: {e}")
+                    time.sleep(delay)
+                    delay *= 2
+                    continue
+                return str(e)
+            except Exception as e:
+                return str(e)
+
+    def stop(self):
+        """Selesaikan semua job yang tersisa lalu hentikan thread."""
+        self._queue.put(None)
+        self.wait()
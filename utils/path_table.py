@@ -0,0 +1,258 @@
+# utils/path_table.py
+
+import os
+import sys
+from array import array
+
+_FS_ENCODING = sys.getfilesystemencoding()
+_FS_ERRORS = sys.getfilesystemencodeerrors()
+
+class PathTable:
+    """
+    Tabel path yang ringkas untuk sesi berisi jutaan file.
+    Setiap path disimpan sebagai (id prefix direktori, nama file):
+      - prefix direktori disimpan sekali per folder,
+      - nama file di-pack ke satu bytearray dengan array offset (setiap nama diakhiri
+        NUL, sehingga buffer bisa di-scan sekaligus oleh regex untuk filter nama),
+      - hash path di array terpisah plus hash table open addressing (array slot)
+        untuk pencarian path -> row tanpa dict berisi string; hash table baru
+        dibangun saat pencarian pertama sehingga import tidak membayar biayanya.
+    Row bersifat append-only sehingga indeks row tetap stabil selama sesi.
+    """
+
+    def __init__(self):
+        self._dirs = []  # dir_id -> prefix direktori (termasuk separator di akhir)
+        self._dir_ids = {}
+        self._dir_of = array('I')
+        self._names = bytearray()
+        self._offsets = array('I', [0])
+        self._hashes = array('q')
+        self._slots = None  # Hash table open addressing, dibangun saat find() pertama
+        self._mask = 0
+
+    def __len__(self):
+        return len(self._dir_of)
+
+    def path(self, row):
+        return self._dirs[self._dir_of[row]] + self.name(row)
+
+    def name(self, row):
+        return self._names[self._offsets[row]:self._offsets[row + 1] - 1].decode(_FS_ENCODING, _FS_ERRORS)
+
+    def folder(self, row):
+        """Direktori file pada `row` (tanpa separator di akhir)."""
+        return os.path.dirname(self._dirs[self._dir_of[row]])
+
+    def folders(self):
+        """Semua direktori yang punya path di tabel (tanpa separator di akhir)."""
+        return [os.path.dirname(prefix) for prefix in self._dirs]
+
+    def rows_in_folder(self, rows, folder):
+        """Row dari `rows` yang file-nya langsung berada di `folder`, dibandingkan lewat id direktori."""
+        dir_id = self._dir_ids.get(os.path.join(folder, ""))
+        if dir_id is None:
+            return []
+        dir_of = self._dir_of
+        return [row for row in rows if dir_of[row] == dir_id]
+
+    def hash_of(self, row):
+        """hash() dari path pada `row`, sama dengan hash(table.path(row))."""
+        return self._hashes[row]
+
+    def name_endswith(self, row, suffix):
+        """Cek akhiran nama file secara case-insensitive tanpa membuat string; `suffix` berupa bytes huruf kecil."""
+        return self._names[self._offsets[row]:self._offsets[row + 1] - 1].lower().endswith(suffix)
+
+    def rows_matching_name(self, regex):
+        """
+        Set row yang namanya cocok dengan `regex` dari query_filter.glob_to_regex
+        (diawali NUL, diakhiri lookahead NUL). Seluruh buffer nama di-scan sekali oleh regex,
+        tanpa membuat string per file.
+        """
+        text = "\0" + self._names.decode(_FS_ENCODING, _FS_ERRORS)
+        rows = set()
+        row = 0
+        position = 0
+        for match in regex.finditer(text):
+            # Jumlah NUL sebelum awal match = nomor row
+            row += text.count("\0", position, match.start())
+            position = match.start()
+            rows.add(row)
+        return rows
+
+    def find(self, path):
+        """Row untuk `path`, atau None jika belum ada di tabel."""
+        if self._slots is None:
+            self._build_index()
+        h = hash(path)
+        mask = self._mask
+        slots = self._slots
+        hashes = self._hashes
+        i = h & mask
+        while True:
+            row = slots[i]
+            if row < 0:
+                return None
+            if hashes[row] == h and self.path(row) == path:
+                return row
+            i = (i + 1) & mask
+
+    def add(self, path):
+        """Kembalikan row `path`, tambahkan dulu jika belum ada (tanpa duplikasi)."""
+        row = self.find(path)
+        if row is None:
+            row = self.extend((path,))[0]
+        return row
+
+    def extend(self, paths):
+        """
+        Tambahkan path baru (pemanggil menjamin belum ada di tabel, misalnya hasil scan)
+        dan kembalikan list row-nya. Tidak ada pengecekan duplikat agar import tetap cepat.
+        """
+        first = len(self._dir_of)
+        sep, altsep = os.sep, os.altsep
+        names = self._names
+        offsets = self._offsets
+        hashes = self._hashes
+        dir_of = self._dir_of
+        dir_ids = self._dir_ids
+        last_prefix, last_dir_id = None, None
+        for path in paths:
+            cut = path.rfind(sep)
+            if altsep:
+                cut = max(cut, path.rfind(altsep))
+            prefix = path[:cut + 1]
+            if prefix != last_prefix:
+                last_dir_id = dir_ids.get(prefix)
+                if last_dir_id is None:
+                    last_dir_id = len(self._dirs)
+                    self._dirs.append(prefix)
+                    dir_ids[prefix] = last_dir_id
+                last_prefix = prefix
+            dir_of.append(last_dir_id)
+            names += path[cut + 1:].encode(_FS_ENCODING, _FS_ERRORS)
+            names.append(0)
+            offsets.append(len(names))
+            hashes.append(hash(path))
+        rows = range(first, len(dir_of))
+        if self._slots is not None:
+            if len(dir_of) * 2 > len(self._slots):
+                self._build_index()
+            else:
+                for row in rows:
+                    self._insert_slot(row)
+        return list(rows)
+
+    def _insert_slot(self, row):
+        mask = self._mask
+        slots = self._slots
+        i = self._hashes[row] & mask
+        while slots[i] >= 0:
+            i = (i + 1) & mask
+        slots[i] = row
+
+    def _build_index(self):
+        """Bangun hash table path -> row; baru dibuat saat pencarian pertama."""
+        size = 8
+        while size < len(self._dir_of) * 4:
+            size *= 2
+        self._slots = array('i', [-1]) * size
+        self._mask = size - 1
+        for row in range(len(self._dir_of)):
+            self._insert_slot(row)
+
+    def nbytes(self):
+        """Perkiraan memori tabel dalam byte (buffer dan array, tanpa prefix direktori)."""
+        return (len(self._names) + self._dir_of.itemsize * len(self._dir_of)
+                + self._offsets.itemsize * len(self._offsets)
+                + self._hashes.itemsize * len(self._hashes)
+                + (self._slots.itemsize * len(self._slots) if self._slots is not None else 0))
+
+class PathList:
+    """
+    Daftar path berbasis indeks row ke PathTable bersama.
+    Berperilaku seperti list of str (len, indeks, slice, iterasi, append, extend, copy),
+    tetapi hanya menyimpan array integer, sehingga image_files, filtered_files,
+    dan salinan di cache tidak menduplikasi string path.
+    """
+
+    def __init__(self, table=None, rows=None):
+        self.table = table if table is not None else PathTable()
+        self.rows = rows if rows is not None else array('I')
+        self._positions = None  # row -> posisi di daftar ini, dibangun saat pertama dibutuhkan
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PathList(self.table, self.rows[index])
+        return self.table.path(self.rows[index])
+
+    def __iter__(self):
+        path = self.table.path
+        for row in self.rows:
+            yield path(row)
+
+    def __contains__(self, path):
+        """O(1) rata-rata: lewat hash table PathTable dan peta posisi."""
+        return self.position(path) is not None
+
+    def row(self, index):
+        return self.rows[index]
+
+    def append(self, path):
+        row = self.table.add(path)
+        self.append_row(row)
+        return row
+
+    def append_row(self, row):
+        if self._positions is not None:
+            self._grow_positions()
+            self._positions[row] = len(self.rows)
+        self.rows.append(row)
+
+    def extend(self, paths):
+        """
+        Tambahkan beberapa path baru (belum ada di tabel, misalnya hasil scan) dan kembalikan
+        list row-nya. Path yang mungkin sudah pernah ada di tabel harus lewat append().
+        """
+        rows = self.table.extend(paths)
+        for row in rows:
+            self.append_row(row)
+        return rows
+
+    def copy(self):
+        return PathList(self.table, array('I', self.rows))
+
+    def select(self, predicate):
+        """Daftar baru berisi row yang memenuhi `predicate(row)`, urutan tetap."""
+        return PathList(self.table, array('I', [row for row in self.rows if predicate(row)]))
+
+    def without_rows(self, rows):
+        """Daftar baru tanpa row dalam set `rows`."""
+        return PathList(self.table, array('I', [row for row in self.rows if row not in rows]))
+
+    def _grow_positions(self):
+        missing = len(self.table) - len(self._positions)
+        if missing > 0:
+            self._positions.extend(array('i', [-1]) * missing)
+
+    def position_of_row(self, row):
+        if self._positions is None:
+            positions = array('i', [-1]) * len(self.table)
+            for position, r in enumerate(self.rows):
+                positions[r] = position
+            self._positions = positions
+        if row >= len(self._positions):
+            return None
+        position = self._positions[row]
+        return position if position >= 0 else None
+
+    def position(self, path):
+        """Indeks `path` di daftar ini, atau None."""
+        row = self.table.find(path)
+        return None if row is None else self.position_of_row(row)
+
+    def nbytes(self):
+        return self.rows.itemsize * len(self.rows)
@@ -0,0 +1,66 @@
+# utils/prefetch.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+from utils.image_utils import MAIN_PREVIEW, NEXT_PREVIEW
+
+class PreviewPrefetcher:
+    """
+    Decode dan resize beberapa gambar berikutnya di worker thread,
+    lalu simpan hasilnya (QImage) ke PreviewCache sebelum pengguna menekan tombol navigasi.
+    """
+
+    def __init__(self, cache, count=3, workers=2):
+        self.cache = cache
+        self.count = count
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="prefetch")
+        self._pending = {}  # path -> Future
+        self._lock = threading.Lock()
+
+    def _load(self, path, token=None):
+        for kind in (MAIN_PREVIEW, NEXT_PREVIEW):
+            if token is not None and token.cancelled:
+                return  # Sesi sudah diganti, jangan decode untuk sesi lama
+            self.cache.get_or_load(path, kind, record=False)
+
+    def schedule(self, paths, token=None):
+        """
+        Jadwalkan prefetch untuk `paths` (urut sesuai arah navigasi).
+        Job untuk path yang tidak lagi diminta (sudah dilewati) dibatalkan,
+        dan job yang sudah jalan berhenti sebelum decode berikutnya jika `token` dibatalkan.
+        """
+        paths = paths[:self.count]
+        wanted = set(paths)
+        with self._lock:
+            for path, future in list(self._pending.items()):
+                if path not in wanted or future.done():
+                    future.cancel()
+                    del self._pending[path]
+            for path in paths:
+                if path not in self._pending:
+                    self._pending[path] = self.executor.submit(self._load, path, token)
+
+    def wait(self, path):
+        """
+        Dipanggil sebelum UI men-decode `path` sendiri. Jika job prefetch sedang berjalan,
+        tunggu hasilnya; jika belum mulai, batalkan agar tidak dikerjakan dua kali.
+        """
+        with self._lock:
+            future = self._pending.pop(path, None)
+        if future is None or future.cancel():
+            return
+        try:
+            future.result()
+        except (CancelledError, Exception) as e:
+            print(f"[DEBUG] Prefetch failed for {path}: {e}")
+
+    def cancel_all(self):
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False)
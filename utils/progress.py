@@ -0,0 +1,55 @@
+# utils/progress.py
+
+import time
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds + 0.5)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+class ProgressThrottle:
+    """
+    Batasi laporan progres dari worker thread menjadi paling banyak
+    `max_per_second` update per detik, sekaligus hitung kecepatan (file/detik)
+    dan perkiraan sisa waktu. Kecepatan dihaluskan dengan EMA agar ETA tidak melompat-lompat.
+    """
+
+    SMOOTHING = 0.3
+
+    def __init__(self, total, max_per_second=10, clock=time.monotonic):
+        self.total = total
+        self.min_interval = 1.0 / max_per_second if max_per_second > 0 else 0.0
+        self.clock = clock
+        self.started = clock()
+        self._last_time = self.started
+        self._last_done = 0
+        self._last_emit = None
+        self.rate = 0.0
+
+    def update(self, done, force=False):
+        """
+        Catat jumlah file yang sudah diproses. Kembalikan (persen, teks format progress bar)
+        jika sudah waktunya mengirim update (atau `force`), selain itu None.
+        """
+        now = self.clock()
+        elapsed = now - self._last_time
+        if elapsed > 0 and done > self._last_done:
+            instant = (done - self._last_done) / elapsed
+            self.rate = instant if self.rate == 0 else self.rate + self.SMOOTHING * (instant - self.rate)
+            self._last_time = now
+            self._last_done = done
+        if not force and self._last_emit is not None and now - self._last_emit < self.min_interval:
+            return None
+        self._last_emit = now
+        percent = int(done / self.total * 100) if self.total else 100
+        return percent, self.format_text(done)
+
+    def format_text(self, done):
+        """Teks untuk QProgressBar.setFormat; %p diganti Qt dengan persentase."""
+        if done >= self.total or self.rate <= 0:
+            return "%p%"
+        eta = (self.total - done) / self.rate
+        return f"%p%  ·  {self.rate:,.0f} files/s  ·  ETA {format_duration(eta)}"
@@ -0,0 +1,173 @@
+# utils/query_filter.py
+
+import calendar
+import re
+import shlex
+
+ALL_FILES = "All Files"
+
+# Kolom numerik yang bisa dibandingkan, beserta alias yang diterima di query bar
+FIELDS = {
+    "size": "size",
+    "width": "width", "w": "width",
+    "height": "height", "h": "height",
+    "mp": "pixels", "pixels": "pixels",
+    "date": "taken", "taken": "taken",
+}
+
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 ** 2, "mb": 1024 ** 2,
+              "g": 1024 ** 3, "gb": 1024 ** 3}
+
+ORIENTATIONS = ("portrait", "landscape", "square")
+
+TERM_RE = re.compile(r"^([a-z]+)(>=|<=|!=|>|<|=|:)(.+)$")
+
+class Query:
+    """
+    Hasil parse teks query bar. Semua syarat digabung dengan AND.
+      conditions : list (kolom, operator, nilai) untuk kolom numerik
+      exts       : set ekstensi (".jpg", ...) atau None jika tidak dibatasi
+      orientation: "portrait" / "landscape" / "square", nilai EXIF 1-8, atau None
+      name_patterns: list regex nama file dari glob_to_regex (tidak membedakan huruf besar/kecil)
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.conditions = []
+        self.exts = None
+        self.orientation = None
+        self.name_patterns = []
+
+    @property
+    def is_empty(self):
+        return not (self.conditions or self.exts or self.orientation or self.name_patterns)
+
+    @property
+    def uses_metadata(self):
+        """True jika hasilnya bergantung pada metadata yang diisi di latar belakang."""
+        return bool(self.conditions or self.orientation)
+
+def glob_to_regex(pattern):
+    """
+    Ubah glob (*, ?, [abc]) menjadi regex yang dibatasi NUL, untuk di-scan langsung
+    pada buffer nama PathTable (lihat PathTable.rows_matching_name).
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "*":
+            parts.append("[^\0]*")
+        elif ch == "?":
+            parts.append("[^\0]")
+        elif ch == "[" and "]" in pattern[i + 1:]:
+            end = pattern.index("]", i + 1)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end
+        else:
+            parts.append(re.escape(ch))
+        i += 1
+    # NUL pembuka ikut dicocokkan (bukan lookbehind) agar regex bisa melompat antar-NUL dengan cepat
+    return re.compile("\0" + "".join(parts) + "(?=\0)", re.IGNORECASE)
+
+def parse_size(text):
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([a-z]*)", text.lower())
+    if not match or match.group(2) not in SIZE_UNITS:
+        raise ValueError(f"invalid size '{text}'")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+def parse_date_range(text):
+    """'2023', '2023-05', atau '2023-05-17' -> (awal, akhir) dalam detik (jam lokal sebagai UTC, sama dengan kolom taken), akhir eksklusif."""
+    match = re.fullmatch(r"(\d{4})(?:-(\d{1,2}))?(?:-(\d{1,2}))?", text)
+    if not match:
+        raise ValueError(f"invalid date '{text}' (use YYYY, YYYY-MM or YYYY-MM-DD)")
+    year = int(match.group(1))
+    month = int(match.group(2) or 1)
+    day = int(match.group(3) or 1)
+    try:
+        start = calendar.timegm((year, month, day, 0, 0, 0))
+    except (ValueError, OverflowError):
+        raise ValueError(f"invalid date '{text}'")
+    if match.group(3):
+        end = start + 86400
+    elif match.group(2):
+        end = calendar.timegm((year + month // 12, month % 12 + 1, 1, 0, 0, 0))
+    else:
+        end = calendar.timegm((year + 1, 1, 1, 0, 0, 0))
+    return start, end
+
+def parse_query(text):
+    """
+    Parse query seperti: `ext:jpg,png size>2mb width>=1920 date:2023 orientation:portrait IMG_*`.
+    Preset lama (".jpg") dan "All Files" tetap didukung. ValueError jika ada term yang tidak dikenali.
+    """
+    query = Query(text)
+    text = text.strip()
+    if not text or text == ALL_FILES:
+        return query
+    try:
+        terms = shlex.split(text)
+    except ValueError as e:
+        raise ValueError(str(e))
+
+    for term in terms:
+        lowered = term.lower()
+        if lowered.startswith(".") and " " not in lowered and TERM_RE.match(lowered) is None:
+            query.exts = (query.exts or set()) | {lowered}
+            continue
+        match = TERM_RE.match(lowered)
+        if match is None:
+            # Kata biasa: cocokkan dengan nama file (glob jika ada wildcard)
+            pattern = term if any(ch in term for ch in "*?[") else f"*{term}*"
+            query.name_patterns.append(glob_to_regex(pattern))
+            continue
+
+        key, op, value = match.groups()
+        if key in ("ext", "type"):
+            if op not in (":", "="):
+                raise ValueError(f"'{key}' only supports ':'")
+            exts = {"." + ext.strip().lstrip(".") for ext in value.split(",") if ext.strip()}
+            query.exts = exts if query.exts is None else query.exts & exts
+        elif key == "name":
+            pattern = term[len(key) + len(op):]
+            query.name_patterns.append(glob_to_regex(pattern))
+        elif key in ("orientation", "orient"):
+            if op not in (":", "="):
+                raise ValueError(f"'{key}' only supports ':'")
+            if value in ORIENTATIONS:
+                query.orientation = value
+            elif value.isdigit() and 1 <= int(value) <= 8:
+                query.orientation = int(value)
+            else:
+                raise ValueError(f"invalid orientation '{value}'")
+        elif key in FIELDS:
+            field = FIELDS[key]
+            if field == "taken":
+                start, end = parse_date_range(value)
+                if op in (":", "="):
+                    query.conditions += [(field, ">=", start), (field, "<", end)]
+                elif op in (">", "<="):
+                    query.conditions.append((field, ">=" if op == ">" else "<", end))
+                else:  # >=, <, !=
+                    if op == "!=":
+                        raise ValueError("'date' does not support '!='")
+                    query.conditions.append((field, op, start))
+                continue
+            if field == "size":
+                number = parse_size(value)
+            elif field == "pixels":
+                try:
+                    number = int(float(value) * 1_000_000)
+                except ValueError:
+                    raise ValueError(f"invalid megapixels '{value}'")
+            else:
+                if not value.isdigit():
+                    raise ValueError(f"invalid {key} '{value}'")
+                number = int(value)
+            query.conditions.append((field, "=" if op == ":" else op, number))
+        else:
+            raise ValueError(f"unknown filter '{key}'")
+    return query
@@ -0,0 +1,115 @@
+# utils/session_order.py
+
+import re
+import threading
+import weakref
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # numpy opsional; tanpa numpy diurutkan dengan sorted()
+    np = None
+
+# Kunci setting -> label menu
+ORDERS = {
+    "natural": "File Name",
+    "mtime": "Date Modified",
+    "taken": "Date Taken",
+    "size": "File Size",
+}
+DEFAULT_ORDER = "natural"
+METADATA_ORDERS = frozenset(("mtime", "taken", "size"))  # Butuh tabel metadata yang sudah terisi
+
+_DIGITS = re.compile(r"(\d+)")
+
+# PathTable -> array('I') peringkat urutan nama natural per row
+_natural_ranks = weakref.WeakKeyDictionary()
+_ranks_lock = threading.Lock()
+
+def natural_key(text):
+    """Kunci urut natural: 'IMG_2.jpg' sebelum 'IMG_10.jpg', tanpa membedakan huruf besar/kecil."""
+    parts = _DIGITS.split(text.casefold())
+    # split() dengan grup selalu bergantian teks/angka, jadi posisi yang sama selalu bertipe sama
+    parts[1::2] = [int(part) for part in parts[1::2]]
+    return parts
+
+def has_natural_ranks(table):
+    """True jika peringkat nama untuk semua row `table` sudah dihitung."""
+    ranks = _natural_ranks.get(table)
+    return ranks is not None and len(ranks) == len(table)
+
+def natural_ranks(table):
+    """
+    Peringkat urutan natural (folder, lalu nama file) untuk setiap row `table`.
+    Dihitung sekali dan disimpan per tabel; dihitung ulang hanya jika tabel bertambah.
+    Aman dipanggil dari thread latar belakang (MetadataThread menghitungnya lebih awal).
+    """
+    with _ranks_lock:
+        ranks = _natural_ranks.get(table)
+        count = len(table)
+        if ranks is not None and len(ranks) == count:
+            return ranks
+        folder_keys = {}
+        keys = []
+        for row in range(count):
+            folder = table.folder(row)
+            folder_key = folder_keys.get(folder)
+            if folder_key is None:
+                folder_key = folder_keys[folder] = natural_key(folder)
+            keys.append((folder_key, natural_key(table.name(row))))
+        ranks = array('I', [0]) * count
+        for rank, row in enumerate(sorted(range(count), key=keys.__getitem__)):
+            ranks[row] = rank
+        _natural_ranks[table] = ranks
+        return ranks
+
+def _column(values, dtype):
+    if not len(values):
+        return np.zeros(0, dtype=dtype)
+    return np.frombuffer(values, dtype=dtype)
+
+def _order_column(order, metadata):
+    """(kolom kunci, fungsi 'nilai diketahui') untuk `order` dari tabel metadata."""
+    if order == "size":
+        return metadata.size, lambda value: value >= 0
+    if order == "taken":
+        return metadata.taken, lambda value: value > 0
+    return metadata.mtime, lambda value: value > 0
+
+def order_rows(rows, order, metadata, table):
+    """
+    Kembalikan array('I') berisi `rows` dalam urutan `order` (lihat ORDERS).
+    Gambar yang metadatanya belum dimuat diletakkan di akhir; nilai yang sama diurutkan
+    natural sehingga hasilnya stabil. Semua kunci sudah tersedia sebagai kolom, jadi
+    dengan numpy pengurutan ulang cukup satu lexsort.
+    """
+    ranks = natural_ranks(table)
+    if order not in METADATA_ORDERS:
+        if np is None:
+            return array('I', sorted(rows, key=ranks.__getitem__))
+        r = _column(rows, np.uint32)
+        return _to_rows(r[np.argsort(_column(ranks, np.uint32)[r], kind="stable")])
+
+    values, is_known = _order_column(order, metadata)
+    if np is None:
+        loaded = metadata.loaded
+        count = len(loaded)
+
+        def key(row):
+            known = row < count and loaded[row] and is_known(values[row])
+            return (0, values[row], ranks[row]) if known else (1, 0, ranks[row])
+        return array('I', sorted(rows, key=key))
+
+    r = _column(rows, np.uint32)
+    in_table = r < len(metadata)
+    safe = np.where(in_table, r, 0)
+    column = _column(values, np.int64)[safe]
+    known = in_table & (_column(metadata.loaded, np.uint8)[safe] == 1) & is_known(column)
+    # lexsort: kunci terakhir paling utama
+    order_index = np.lexsort((_column(ranks, np.uint32)[r], np.where(known, column, 0), ~known))
+    return _to_rows(r[order_index])
+
+def _to_rows(values):
+    rows = array('I')
+    rows.frombytes(values.astype(np.uint32).tobytes())
+    return rows
@@ -0,0 +1,104 @@
+# utils/stat_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+class StatCache:
+    """
+    Cache hasil os.stat per path (ada/tidak, ukuran, mtime) untuk navigasi, tampilan,
+    dan pemindahan. Setiap hasil berlaku `ttl` detik; pemindahan oleh aplikasi sendiri
+    dan event watcher folder membuang entri terkait lebih awal. Jumlah entri dibatasi
+    `max_entries` (LRU). Path yang akan segera dibuka bisa di-stat sekaligus di worker
+    latar belakang (refresh) agar thread UI tidak menunggu disk.
+    Aman dipakai dari beberapa thread (preview di-load juga dari worker prefetch).
+    """
+
+    def __init__(self, ttl=2.0, max_entries=50_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items = OrderedDict()  # path -> (waktu cek, os.stat_result atau None jika tidak ada)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stat-refresh")
+        self._futures = set()  # Refresh yang belum selesai, dibatalkan saat shutdown()
+        self.hits = 0
+        self.misses = 0
+        self.refreshed = 0
+
+    def cached(self, path):
+        """(ditemukan, stat) dari cache tanpa menyentuh disk; stat None berarti file tidak ada."""
+        with self._lock:
+            item = self._items.get(path)
+            if item is None or time.monotonic() - item[0] >= self.ttl:
+                return False, None
+            self._items.move_to_end(path)
+            return True, item[1]
+
+    def stat(self, path):
+        """os.stat_result untuk `path`, atau None jika file tidak ada/tidak bisa dibaca."""
+        found, st = self.cached(path)
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if found:
+            return st
+        return self._stat_now(path)
+
+    def exists(self, path):
+        return self.stat(path) is not None
+
+    def _stat_now(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        with self._lock:
+            self._items[path] = (time.monotonic(), st)
+            self._items.move_to_end(path)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return st
+
+    def refresh(self, paths):
+        """Stat ulang `paths` yang belum ada atau sudah kedaluwarsa di cache, sebagai satu batch di latar belakang."""
+        stale = [path for path in paths if not self.cached(path)[0]]
+        if stale:
+            future = self._executor.submit(self._refresh, stale)
+            self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
+
+    def _refresh(self, paths):
+        for path in paths:
+            self._stat_now(path)
+        with self._lock:
+            self.refreshed += len(paths)
+
+    def invalidate(self, *paths):
+        with self._lock:
+            for path in paths:
+                self._items.pop(path, None)
+
+    def invalidate_folder(self, folder):
+        """Buang entri file yang langsung berada di `folder` (event watcher folder)."""
+        with self._lock:
+            for path in [path for path in self._items if os.path.dirname(path) == folder]:
+                del self._items[path]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def summary(self):
+        with self._lock:
+            return (f"{len(self._items)} entries, {self.hits} hits, {self.misses} misses, "
+                    f"{self.refreshed} refreshed in background")
+
+    def shutdown(self):
+        # Refresh yang masih antre dibatalkan manual (cancel_futures baru ada di Python 3.9)
+        for future in list(self._futures):
+            future.cancel()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,242 @@
+# utils/thumbnail_cache.py
+
+import hashlib
+import os
+import sqlite3
+import struct
+import threading
+from urllib.parse import quote
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage
+
+# Ukuran maksimum sisi terpanjang per direktori, sesuai freedesktop Thumbnail Managing Standard
+FLAVORS = (("normal", 128), ("large", 256), ("x-large", 512), ("xx-large", 1024))
+SOFTWARE = "Image Sorter"
+FLAVOR_TOLERANCE = 0.95  # Thumbnail 256 px tetap dipakai untuk target 260 px (diperbesar < 2%)
+CLEANUP_TARGET = 0.9  # Setelah cleanup, isi cache turun ke 90% batas agar cleanup tidak terus berulang
+
+def default_thumbnail_root():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "thumbnails")
+
+def path_to_uri(path):
+    """URI file:// untuk path absolut, di-escape seperti g_filename_to_uri agar hash-nya sama dengan aplikasi lain."""
+    return "file://" + quote(os.fsencode(os.path.abspath(path)), safe="/!$&'()*+,;=:@~")
+
+def png_text_chunks(data):
+    """
+    tEXt chunk sebuah PNG sebagai dict. QImageReader.text() memecah kunci di ':' sehingga
+    kunci seperti "Thumb::URI" tidak bisa dibaca lewat Qt.
+    """
+    texts = {}
+    offset = 8
+    while offset + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[offset:offset + 8])
+        if kind == b'IEND':
+            break
+        if kind == b'tEXt':
+            key, _, value = data[offset + 8:offset + 8 + length].partition(b'\0')
+            texts[key.decode("latin-1")] = value.decode("latin-1")
+        offset += 12 + length  # panjang(4) jenis(4) data CRC(4)
+    return texts
+
+def flavor_for(target_size):
+    """Direktori terkecil yang thumbnail-nya cukup besar untuk `target_size` (lebar, tinggi)."""
+    needed = max(target_size) * FLAVOR_TOLERANCE
+    for name, size in FLAVORS:
+        if size >= needed:
+            return name, size
+    return FLAVORS[-1]
+
+class ThumbnailCache:
+    """
+    Cache thumbnail persisten di disk dengan layout freedesktop
+    (~/.cache/thumbnails/<flavor>/<md5(uri)>.png), sehingga thumbnail bisa dipakai
+    bersama file manager dan penampil gambar lain di Linux.
+    Validitas dicek lewat tEXt chunk Thumb::URI dan Thumb::MTime di PNG.
+    Direktori ini dipakai bersama aplikasi lain, jadi batas `max_bytes` per flavor hanya
+    berlaku untuk thumbnail yang ditulis aplikasi ini: setiap thumbnail yang ditulis dicatat
+    di indeks SQLite `index_path`, dan hanya entri indeks itu yang dihitung dan dihapus
+    (yang paling lama tidak dipakai lebih dulu; mtime file diperbarui setiap kali dipakai).
+    """
+
+    def __init__(self, max_bytes, root=None, index_path=None):
+        self.max_bytes = max_bytes
+        self.root = root or default_thumbnail_root()
+        self.index_path = index_path or os.path.join(self.root, "image-sorter-index.db")
+        self._lock = threading.Lock()
+        self._bytes = {}  # flavor -> total byte thumbnail milik aplikasi ini, dibaca dari indeks saat pertama menulis
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS thumbnails (
+                path TEXT PRIMARY KEY,
+                flavor TEXT NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        return conn
+
+    def thumbnail_path(self, uri, flavor):
+        return os.path.join(self.root, flavor, hashlib.md5(uri.encode()).hexdigest() + ".png")
+
+    def load(self, path, mtime, target_size):
+        """
+        Thumbnail untuk `path` dengan mtime (detik) `mtime`, atau None jika belum ada
+        atau sudah kedaluwarsa. Hasilnya paling besar ukuran flavor untuk `target_size`.
+        """
+        uri = path_to_uri(path)
+        flavor, _ = flavor_for(target_size)
+        thumb_path = self.thumbnail_path(uri, flavor)
+        try:
+            with open(thumb_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = b''
+        texts = png_text_chunks(data) if data.startswith(b'\x89PNG') else {}
+        image = None
+        if texts.get("Thumb::URI") == uri and texts.get("Thumb::MTime") == str(int(mtime)):
+            image = QImage.fromData(data, "PNG")
+        if image is None or image.isNull():
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(thumb_path)  # Tandai baru dipakai untuk LRU
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return image
+
+    def save(self, path, mtime, size, image, target_size):
+        """
+        Simpan `image` (sudah di-resize ke ukuran flavor, lihat flavor_for) sebagai thumbnail `path`.
+        Ditulis ke file sementara lalu di-rename agar pembaca lain tidak melihat file setengah jadi.
+        """
+        uri = path_to_uri(path)
+        flavor, flavor_size = flavor_for(target_size)
+        if max(image.width(), image.height()) > flavor_size:
+            image = image.scaled(flavor_size, flavor_size, Qt.AspectRatioMode.KeepAspectRatio,
+                                 Qt.TransformationMode.SmoothTransformation)
+        image = image.copy()  # setText mengubah gambar; jangan sentuh QImage milik pemanggil
+        image.setText("Thumb::URI", uri)
+        image.setText("Thumb::MTime", str(int(mtime)))
+        image.setText("Thumb::Size", str(size))
+        image.setText("Software", SOFTWARE)
+
+        thumb_path = self.thumbnail_path(uri, flavor)
+        temp_path = f"{thumb_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.root, mode=0o700, exist_ok=True)
+            os.makedirs(os.path.dirname(thumb_path), mode=0o700, exist_ok=True)
+            if not image.save(temp_path, "PNG"):
+                return False
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, thumb_path)
+            written = os.path.getsize(thumb_path)
+            previous = self._record(thumb_path, flavor, written)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[DEBUG] Failed to write thumbnail for {path}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+
+        with self._lock:
+            self.writes += 1
+            if flavor not in self._bytes:
+                self._bytes[flavor] = self._indexed_size(flavor)
+            else:
+                self._bytes[flavor] += written - previous
+            over_limit = self._bytes[flavor] > self.max_bytes
+        if over_limit:
+            self.cleanup(flavor)
+        return True
+
+    def _record(self, thumb_path, flavor, size):
+        """Catat thumbnail milik aplikasi ini di indeks; kembalikan ukuran entri sebelumnya (0 jika baru)."""
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute("SELECT size FROM thumbnails WHERE path = ?", (thumb_path,)).fetchone()
+                conn.execute("INSERT OR REPLACE INTO thumbnails (path, flavor, size) VALUES (?, ?, ?)",
+                             (thumb_path, flavor, size))
+        finally:
+            conn.close()
+        return row[0] if row is not None else 0
+
+    def _indexed_size(self, flavor):
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbnails WHERE flavor = ?",
+                                    (flavor,)).fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Error reading thumbnail index: {e}")
+            return 0
+
+    def _entries(self, flavor):
+        """(waktu terakhir dipakai, path, ukuran) thumbnail milik aplikasi ini; entri yang filenya hilang dibuang."""
+        entries = []
+        gone = []
+        conn = self._connect()
+        try:
+            for thumb_path, size in conn.execute("SELECT path, size FROM thumbnails WHERE flavor = ?", (flavor,)):
+                try:
+                    entries.append((os.stat(thumb_path).st_mtime, thumb_path, size))
+                except OSError:
+                    gone.append(thumb_path)
+            if gone:
+                with conn:
+                    conn.executemany("DELETE FROM thumbnails WHERE path = ?", ((path,) for path in gone))
+        finally:
+            conn.close()
+        return entries
+
+    def cleanup(self, flavor):
+        """Hapus thumbnail milik aplikasi ini yang paling lama tidak dipakai sampai total di bawah batas."""
+        try:
+            entries = sorted(self._entries(flavor))
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Error reading thumbnail index: {e}")
+            return
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * CLEANUP_TARGET
+        removed = []
+        for _, thumb_path, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(thumb_path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
+            removed.append(thumb_path)
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("DELETE FROM thumbnails WHERE path = ?", ((path,) for path in removed))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[DEBUG] Error saving thumbnail index: {e}")
+        with self._lock:
+            self._bytes[flavor] = total
+        print(f"[DEBUG] Thumbnail cache cleanup ({flavor}): removed {len(removed)}, {total / 1048576:.1f} MB left")
+
+    def summary(self):
+        with self._lock:
+            return f"{self.hits} disk thumbnail hits, {self.misses} misses, {self.writes} written"
@@ -0,0 +1,247 @@
+# utils/thumbnail_pack.py
+
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice
+
+from utils.image_utils import load_embedded_thumbnail, load_scaled_image
+
+INDEX_MAGIC = b"ISTP"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sHHH6x")  # magic, versi, lebar, tinggi thumbnail (16 byte)
+INDEX_RECORD = struct.Struct("<QqQI")  # kunci nama, mtime_ns, offset, panjang (28 byte)
+JPEG_QUALITY = 85
+
+def name_key(name):
+    """Kunci 64-bit yang stabil antar-proses untuk nama file (hash() Python diacak per proses)."""
+    return int.from_bytes(hashlib.blake2b(os.fsencode(name), digest_size=8).digest(), "little")
+
+class ThumbnailPack:
+    """
+    Satu file pack thumbnail untuk satu folder sumber: JPEG thumbnail ditulis berurutan
+    (append-only) ke `<id>.pack`, dan setiap entri dicatat di `<id>.idx` sebagai record
+    berukuran tetap (kunci nama, mtime_ns, offset, panjang).
+    File pack di-mmap sehingga membaca thumbnail cukup satu slice, tanpa open() per file.
+    Entri yang lebih baru untuk nama yang sama menggantikan entri lama.
+    """
+
+    def __init__(self, base_path, thumb_size, max_bytes):
+        self.pack_path = base_path + ".pack"
+        self.index_path = base_path + ".idx"
+        self.thumb_size = thumb_size
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = {}  # kunci nama -> (mtime_ns, offset, panjang)
+        self._map = None
+        self._pack_size = 0
+        self._load_index()
+        # Handle baca tetap terbuka untuk mmap; handle tulis dibuka saat pertama menulis
+        self._reader = open(self.pack_path, 'rb') if os.path.exists(self.pack_path) else None
+        self._pack_writer = None
+        self._index_writer = None
+
+    def _load_index(self):
+        header = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, *self.thumb_size)
+        try:
+            pack_size = os.path.getsize(self.pack_path)
+            with open(self.index_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as index:
+                    if index[:INDEX_HEADER.size] != header:
+                        raise ValueError("pack format or thumbnail size changed")
+                    end = INDEX_HEADER.size + (len(index) - INDEX_HEADER.size) // INDEX_RECORD.size * INDEX_RECORD.size
+                    for key, mtime_ns, offset, length in INDEX_RECORD.iter_unpack(index[INDEX_HEADER.size:end]):
+                        if offset + length <= pack_size:  # Abaikan record dari penulisan yang terputus
+                            self._entries[key] = (mtime_ns, offset, length)
+            self._pack_size = pack_size
+        except (OSError, ValueError) as e:
+            # Belum ada atau tidak cocok: mulai pack baru
+            if os.path.exists(self.index_path) or os.path.exists(self.pack_path):
+                print(f"[DEBUG] Resetting thumbnail pack {self.pack_path}: {e}")
+            self._entries = {}
+            self._pack_size = 0
+            for path in (self.pack_path, self.index_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    def has(self, name, mtime_ns):
+        entry = self._entries.get(name_key(name))
+        return entry is not None and entry[0] == mtime_ns
+
+    def get(self, name, mtime_ns):
+        """Bytes JPEG thumbnail `name` jika ada dan mtime-nya cocok, atau None."""
+        entry = self._entries.get(name_key(name))
+        if entry is None or entry[0] != mtime_ns:
+            return None
+        _, offset, length = entry
+        with self._lock:
+            if self._map is None or offset + length > len(self._map):
+                self._remap()
+                if self._map is None:
+                    return None
+            return self._map[offset:offset + length]
+
+    def _remap(self):
+        """Petakan ulang file pack setelah bertambah (handle yang sama, tanpa open() baru)."""
+        if self._reader is None:
+            if not os.path.exists(self.pack_path):
+                return
+            self._reader = open(self.pack_path, 'rb')
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if os.fstat(self._reader.fileno()).st_size:
+            self._map = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def append(self, name, mtime_ns, data):
+        """Tambahkan thumbnail; False jika pack sudah mencapai batas ukuran."""
+        with self._lock:
+            if self._pack_size + len(data) > self.max_bytes:
+                return False
+            if self._pack_writer is None:
+                self._pack_writer = open(self.pack_path, 'ab')
+                new_index = not os.path.exists(self.index_path)
+                self._index_writer = open(self.index_path, 'ab')
+                if new_index:
+                    self._index_writer.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, *self.thumb_size))
+            offset = self._pack_size
+            # Data ditulis dan di-flush sebelum record indeks agar indeks tidak menunjuk data yang belum ada
+            self._pack_writer.write(data)
+            self._pack_writer.flush()
+            key = name_key(name)
+            self._index_writer.write(INDEX_RECORD.pack(key, mtime_ns, offset, len(data)))
+            self._index_writer.flush()
+            self._pack_size += len(data)
+            self._entries[key] = (mtime_ns, offset, len(data))
+            return True
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            for handle in (self._reader, self._pack_writer, self._index_writer):
+                if handle is not None:
+                    handle.close()
+            self._reader = self._pack_writer = self._index_writer = None
+
+class ThumbnailPackStore:
+    """
+    Kumpulan pack thumbnail, satu per folder sumber, disimpan lokal di `root`.
+    Pack diisi di latar belakang (satu worker) selama import dan dibaca oleh jalur
+    preview berikutnya. Paling banyak `max_open` pack dibiarkan terbuka (LRU).
+    """
+
+    def __init__(self, root, thumb_size, max_bytes_per_folder, max_open=8):
+        self.root = root
+        self.thumb_size = thumb_size
+        self.max_bytes = max_bytes_per_folder
+        self.max_open = max_open
+        self._packs = OrderedDict()  # folder -> ThumbnailPack
+        self._missing = set()  # Folder yang belum punya pack, agar tidak di-stat setiap preview
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnail-pack")
+        self._futures = set()  # Batch yang belum selesai, dibatalkan saat shutdown()
+        self.hits = 0
+        self.misses = 0
+        self.written = 0
+
+    def base_path(self, folder):
+        key = os.path.normcase(os.path.abspath(folder))
+        return os.path.join(self.root, hashlib.md5(os.fsencode(key)).hexdigest())
+
+    def pack_for(self, folder, create=False):
+        with self._lock:
+            pack = self._packs.get(folder)
+            if pack is not None:
+                self._packs.move_to_end(folder)
+                return pack
+            if not create and folder in self._missing:
+                return None
+            base_path = self.base_path(folder)
+            if not create and not os.path.exists(base_path + ".idx"):
+                self._missing.add(folder)
+                return None
+            self._missing.discard(folder)
+            os.makedirs(self.root, exist_ok=True)
+            pack = ThumbnailPack(base_path, self.thumb_size, self.max_bytes)
+            self._packs[folder] = pack
+            while len(self._packs) > self.max_open:
+                _, old = self._packs.popitem(last=False)
+                old.close()
+            return pack
+
+    def load(self, path, mtime_ns):
+        """Bytes JPEG thumbnail untuk `path`, atau None jika belum ada di pack foldernya."""
+        folder, name = os.path.split(path)
+        pack = self.pack_for(folder)
+        data = pack.get(name, mtime_ns) if pack is not None else None
+        with self._lock:
+            if data is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return data
+
+    def schedule(self, paths, token=None):
+        """Buat thumbnail untuk `paths` yang belum ada di pack, di worker latar belakang."""
+        if paths:
+            future = self._executor.submit(self._write, list(paths), token)
+            self._futures.add(future)
+            future.add_done_callback(self._futures.discard)
+
+    def _write(self, paths, token):
+        for path in paths:
+            if token is not None and token.cancelled:
+                return
+            folder, name = os.path.split(path)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                pack = self.pack_for(folder, create=True)
+            except OSError:
+                continue
+            if pack.has(name, mtime_ns):
+                continue
+            image = load_embedded_thumbnail(path, self.thumb_size)
+            if image is None:
+                image = load_scaled_image(path, self.thumb_size, smooth=False)
+            if image.isNull():
+                continue
+            data = QByteArray()
+            buffer = QBuffer(data)
+            buffer.open(QIODevice.WriteOnly)
+            image.save(buffer, "JPG", JPEG_QUALITY)
+            buffer.close()
+            try:
+                if not pack.append(name, mtime_ns, bytes(data)):
+                    continue  # Pack penuh
+            except OSError as e:
+                print(f"[DEBUG] Failed to write thumbnail pack for {folder}: {e}")
+                return
+            with self._lock:
+                self.written += 1
+
+    def summary(self):
+        with self._lock:
+            return f"{self.hits} pack thumbnail hits, {self.misses} misses, {self.written} packed"
+
+    def shutdown(self):
+        # Tunggu thumbnail yang sedang ditulis (pemanggil sudah membatalkan token sesi)
+        # Batch yang masih antre dibatalkan manual (cancel_futures baru ada di Python 3.9)
+        for future in list(self._futures):
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for pack in self._packs.values():
+                pack.close()
+            self._packs.clear()